@@ -4,15 +4,37 @@ import os
 from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
+from typing import Mapping
+
+
+_VALID_PROVIDERS: frozenset[str] = frozenset({"openai", "kimi"})
+_TRUTHY_VALUES: frozenset[str] = frozenset({"1", "true", "yes", "on"})
+_FALSY_VALUES: frozenset[str] = frozenset({"0", "false", "off", "no"})
+
+_ensured_dirs: set[Path] = set()
+
+
+def ensure_dir(path: Path) -> None:
+    if path in _ensured_dirs:
+        return
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not path.is_dir():
+            raise
+    except FileNotFoundError:
+        # Only the first run needs the recursive walk to create missing parents.
+        path.mkdir(parents=True, exist_ok=True)
+    _ensured_dirs.add(path)
 
 
 def _split_csv(value: str) -> list[str]:
-    return [item.strip() for item in value.split(",") if item.strip()]
+    return [item for item in map(str.strip, value.split(",")) if item]
 
 
-def _first_env(*names: str) -> str | None:
+def _first_env(env: Mapping[str, str], *names: str) -> str | None:
     for name in names:
-        value = os.getenv(name)
+        value = env.get(name)
         if value and value.strip():
             return value.strip()
     return None
@@ -32,35 +54,38 @@ class Settings:
     kimi_model: str = "moonshot-v1-8k"
     kimi_base_url: str = "https://api.moonshot.cn/v1"
     debug_llm: bool = False
+    layout_pack: bool = True
+    plan_cache: bool = True
+    plan_cache_max_entries: int = 256
+    plan_cache_ttl_seconds: float = 900.0
     max_free_uses: int = 5
     preview_rows: int = 15
+    worker_threads: int = 0
     cors_origins: list[str] = field(
         default_factory=lambda: ["http://localhost:5173", "http://127.0.0.1:5173"]
     )
 
     @classmethod
     def from_env(cls) -> "Settings":
+        env = os.environ
         base_dir = Path(__file__).resolve().parent.parent
-        data_dir_raw = os.getenv("DATA_DIR", str(base_dir / "data"))
-        usage_db_raw = os.getenv("USAGE_DB_PATH", str(Path(data_dir_raw) / "usage.db"))
-        cors_raw = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
+        data_dir_raw = env.get("DATA_DIR", str(base_dir / "data"))
+        usage_db_raw = env.get("USAGE_DB_PATH", str(Path(data_dir_raw) / "usage.db"))
+        cors_raw = env.get("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
 
-        raw_provider = os.getenv("LLM_PROVIDER", "openai").strip().lower()
-        llm_provider = raw_provider if raw_provider in {"openai", "kimi"} else "openai"
+        raw_provider = env.get("LLM_PROVIDER", "openai").strip().lower()
+        llm_provider = raw_provider if raw_provider in _VALID_PROVIDERS else "openai"
+        kimi_api_key = _first_env(env, "KIMI_API_KEY")
+        kimi_model = _first_env(env, "KIMI_MODEL") or "moonshot-v1-8k"
+        kimi_base_url = _first_env(env, "KIMI_BASE_URL") or "https://api.moonshot.cn/v1"
         if llm_provider == "kimi":
             openai_api_key = None
             openai_model = "gpt-4.1-mini"
             openai_base_url = None
-            kimi_api_key = _first_env("KIMI_API_KEY")
-            kimi_model = _first_env("KIMI_MODEL") or "moonshot-v1-8k"
-            kimi_base_url = _first_env("KIMI_BASE_URL") or "https://api.moonshot.cn/v1"
         else:
-            openai_api_key = _first_env("OPENAI_API_KEY", "LLM_API_KEY")
-            openai_model = _first_env("OPENAI_MODEL", "LLM_MODEL") or "gpt-4.1-mini"
-            openai_base_url = _first_env("OPENAI_BASE_URL", "LLM_BASE_URL")
-            kimi_api_key = _first_env("KIMI_API_KEY")
-            kimi_model = _first_env("KIMI_MODEL") or "moonshot-v1-8k"
-            kimi_base_url = _first_env("KIMI_BASE_URL") or "https://api.moonshot.cn/v1"
+            openai_api_key = _first_env(env, "OPENAI_API_KEY", "LLM_API_KEY")
+            openai_model = _first_env(env, "OPENAI_MODEL", "LLM_MODEL") or "gpt-4.1-mini"
+            openai_base_url = _first_env(env, "OPENAI_BASE_URL", "LLM_BASE_URL")
 
         return cls(
             data_dir=Path(data_dir_raw),
@@ -72,9 +97,14 @@ class Settings:
             kimi_api_key=kimi_api_key,
             kimi_model=kimi_model,
             kimi_base_url=kimi_base_url,
-            debug_llm=os.getenv("DEBUG_LLM", "false").strip().lower() in {"1", "true", "yes", "on"},
-            max_free_uses=int(os.getenv("MAX_FREE_USES", "5")),
-            preview_rows=int(os.getenv("PREVIEW_ROWS", "15")),
+            debug_llm=env.get("DEBUG_LLM", "false").strip().lower() in _TRUTHY_VALUES,
+            layout_pack=env.get("LAYOUT_PACK", "1").strip().lower() not in _FALSY_VALUES,
+            plan_cache=env.get("PLAN_CACHE", "1").strip().lower() not in _FALSY_VALUES,
+            plan_cache_max_entries=int(env.get("PLAN_CACHE_MAX_ENTRIES", "256")),
+            plan_cache_ttl_seconds=float(env.get("PLAN_CACHE_TTL_SECONDS", "900")),
+            max_free_uses=int(env.get("MAX_FREE_USES", "5")),
+            preview_rows=int(env.get("PREVIEW_ROWS", "15")),
+            worker_threads=int(env.get("WORKER_THREADS", "0")),
             cors_origins=_split_csv(cors_raw),
         )
 
@@ -82,6 +112,6 @@ class Settings:
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
     settings = Settings.from_env()
-    settings.data_dir.mkdir(parents=True, exist_ok=True)
-    settings.usage_db_path.parent.mkdir(parents=True, exist_ok=True)
+    ensure_dir(settings.data_dir)
+    ensure_dir(settings.usage_db_path.parent)
     return settings
@@ -1,20 +1,37 @@
 from __future__ import annotations
 
-import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import Settings, get_settings
 from app.routers.transform import router as transform_router
 from app.services.container import build_services
 
-logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Sync endpoints (plan application, file I/O) run on anyio's worker threads; 0 keeps its default of 40.
+    worker_threads = app.state.settings.worker_threads
+    if worker_threads > 0:
+        to_thread.current_default_thread_limiter().total_tokens = worker_threads
+    yield
+    app.state.services.analytics_logger.close()
+    app.state.services.usage_limiter.close()
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
     active_settings = settings or get_settings()
-    app = FastAPI(title=active_settings.app_name, version=active_settings.app_version)
+    app = FastAPI(
+        title=active_settings.app_name,
+        version=active_settings.app_version,
+        lifespan=_lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,14 +43,6 @@ def create_app(settings: Settings | None = None) -> FastAPI:
 
     app.state.settings = active_settings
     app.state.services = build_services(active_settings)
-    log_message = "LLM provider configured: provider=%s model=%s base_url=%s"
-    log_args = (
-        app.state.services.llm_planner.provider,
-        app.state.services.llm_planner.model,
-        app.state.services.llm_planner.base_url or "(default)",
-    )
-    logger.info(log_message, *log_args)
-    print(log_message % log_args)
     app.include_router(transform_router)
 
     @app.get("/health", tags=["system"])
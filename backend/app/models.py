@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ColumnProfile(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     name: str
     dtype: str
     null_count: int
@@ -14,6 +16,8 @@ class ColumnProfile(BaseModel):
 
 
 class DatasetAnalysis(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     row_count: int
     column_count: int
     columns: list[ColumnProfile]
@@ -27,6 +31,8 @@ class UploadResponse(BaseModel):
 
 
 class PlanRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     file_id: str = Field(min_length=8, max_length=64)
     prompt: str = Field(min_length=3, max_length=3000)
     user_id: str = Field(min_length=2, max_length=128)
@@ -49,6 +55,8 @@ PlanUnion = PlanResponse | ClarifyResponse
 
 
 class ClarifyRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     file_id: str = Field(min_length=8, max_length=64)
     prompt: str = Field(min_length=3, max_length=3000)
     clarify_id: str = Field(min_length=8, max_length=128)
@@ -56,6 +64,8 @@ class ClarifyRequest(BaseModel):
 
 
 class ApplyRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     file_id: str = Field(min_length=8, max_length=64)
     user_id: str = Field(min_length=2, max_length=128)
     plan: dict[str, Any]
@@ -63,11 +73,15 @@ class ApplyRequest(BaseModel):
 
 
 class PreviewRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     file_id: str = Field(min_length=8, max_length=64)
     plan: dict[str, Any]
 
 
 class PreviewStep(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     title: str
     description: str
     columns: list[str] = Field(default_factory=list)
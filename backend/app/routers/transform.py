@@ -1,18 +1,23 @@
 from __future__ import annotations
 
+import os
+from functools import partial
 from pathlib import Path
 from time import perf_counter
-from typing import Any
+from typing import Annotated, Any
 from uuid import uuid4
 
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+import pandas as pd
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile
 from fastapi.responses import FileResponse
 
+from app.config import Settings
 from app.models import (
     ApplyRequest,
     ApplyResponse,
     ClarifyRequest,
     ClarifyResponse,
+    DatasetAnalysis,
     PlanUnion,
     PlanRequest,
     PlanResponse,
@@ -23,6 +28,7 @@ from app.models import (
 )
 from app.services.analyzer import analysis_for_llm, build_analysis
 from app.services.container import ServiceContainer
+from app.services.file_store import FileStore
 from app.services.plan_explainer import explain_plan
 from app.services.transformer import TransformationError, apply_plan
 
@@ -32,40 +38,69 @@ EMPTY_PLAN_OPERATIONS_ERROR = (
     "Il piano non contiene operazioni. Genera o modifica il piano prima di applicarlo."
 )
 
+# Maps exceptions raised while applying a plan to (analytics error_code, HTTP status, fixed detail).
+# A detail of None means the exception message is returned to the client.
+TRANSFORM_ERROR_MAP: dict[type[Exception], tuple[str, int, str | None]] = {
+    FileNotFoundError: ("source_not_found", 404, "Source file not found."),
+    TransformationError: ("invalid_plan", 400, None),
+    ValueError: ("invalid_request", 400, None),
+}
 
-def _services(request: Request) -> ServiceContainer:
+
+def get_services(request: Request) -> ServiceContainer:
     return request.app.state.services
 
 
+def get_app_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+ServicesDep = Annotated[ServiceContainer, Depends(get_services)]
+SettingsDep = Annotated[Settings, Depends(get_app_settings)]
+
+
+def _source_analysis(
+    file_store: FileStore,
+    file_id: str,
+    preview_rows: int,
+) -> tuple[DatasetAnalysis, dict[str, Any]]:
+    # The analysis of an upload is shared by upload, plan and clarify.
+    def build(df: pd.DataFrame) -> tuple[DatasetAnalysis, dict[str, Any]]:
+        analysis = build_analysis(df, preview_rows)
+        return analysis, analysis_for_llm(analysis)
+
+    return file_store.upload_analysis(file_id, preview_rows, build)
+
+
 def _extract_file_size_bytes(services: ServiceContainer, file_id: str) -> int | None:
     try:
-        metadata = services.file_store.get_upload_meta(file_id)
-        raw_size = metadata.get("file_size_bytes")
-        if isinstance(raw_size, int):
-            return max(0, raw_size)
-        if isinstance(raw_size, str) and raw_size.isdigit():
-            return int(raw_size)
-        stored_path = metadata.get("stored_path")
-        if isinstance(stored_path, str):
-            path = Path(stored_path)
-            if path.exists():
-                return int(path.stat().st_size)
+        return services.file_store.get_upload_size(file_id)
     except Exception:
         return None
+
+
+def _lookup_transform_error(error: Exception) -> tuple[str, int, str | None] | None:
+    for error_type in type(error).__mro__:
+        mapped = TRANSFORM_ERROR_MAP.get(error_type)
+        if mapped is not None:
+            return mapped
     return None
 
 
+def _clarification_question(plan: dict[str, Any]) -> str | None:
+    question = plan.get("clarification_question")
+    return question.strip() if isinstance(question, str) and question.strip() else None
+
+
 def _clarification_guard(plan: dict[str, Any]) -> str | None:
-    needs_clarification = bool(plan.get("needs_clarification", False))
     operations = plan.get("operations")
-    has_operations = isinstance(operations, list) and len(operations) > 0
-    question = plan.get("clarification_question")
+    if isinstance(operations, list) and operations and not plan.get("needs_clarification", False):
+        return None
 
-    if needs_clarification or not has_operations:
-        if isinstance(question, str) and question.strip():
-            return question.strip()
-        return "La richiesta e ambigua o incompleta. Specifica meglio il prompt prima di continuare."
-    return None
+    question = _clarification_question(plan)
+    if question:
+        return question
+    return "La richiesta e ambigua o incompleta. Specifica meglio il prompt prima di continuare."
 
 
 def _to_plan_union(payload: dict[str, Any]) -> PlanUnion:
@@ -94,10 +129,9 @@ def _to_plan_union(payload: dict[str, Any]) -> PlanUnion:
 
 
 @router.get("/usage/{user_id}", response_model=UsageResponse)
-def get_usage(user_id: str, request: Request) -> UsageResponse:
-    services = _services(request)
+def get_usage(user_id: str, services: ServicesDep) -> UsageResponse:
     usage_count = services.usage_limiter.get_usage(user_id)
-    remaining = services.usage_limiter.get_remaining(user_id)
+    remaining = services.usage_limiter.remaining_for(usage_count)
     return UsageResponse(
         user_id=user_id,
         usage_count=usage_count,
@@ -107,16 +141,17 @@ def get_usage(user_id: str, request: Request) -> UsageResponse:
 
 
 @router.post("/files/upload", response_model=UploadResponse)
-def upload_file(request: Request, file: UploadFile = File(...)) -> UploadResponse:
-    services = _services(request)
-    settings = request.app.state.settings
+def upload_file(
+    services: ServicesDep,
+    settings: SettingsDep,
+    file: UploadFile = File(...),
+) -> UploadResponse:
     if not file.filename:
         raise HTTPException(status_code=400, detail="filename is required")
 
     try:
         metadata = services.file_store.save_upload(file)
-        df = services.file_store.load_upload_df(metadata["file_id"])
-        analysis = build_analysis(df, settings.preview_rows)
+        analysis, _ = _source_analysis(services.file_store, metadata["file_id"], settings.preview_rows)
     except ValueError as error:
         raise HTTPException(status_code=400, detail=str(error)) from error
     except Exception as error:  # pragma: no cover
@@ -132,36 +167,30 @@ def upload_file(request: Request, file: UploadFile = File(...)) -> UploadRespons
 
 
 @router.post("/plan", response_model=PlanUnion)
-def generate_plan(payload: PlanRequest, request: Request) -> PlanUnion:
-    services = _services(request)
-    settings = request.app.state.settings
+def generate_plan(payload: PlanRequest, services: ServicesDep, settings: SettingsDep) -> PlanUnion:
     try:
-        df = services.file_store.load_upload_df(payload.file_id)
+        _, llm_analysis = _source_analysis(services.file_store, payload.file_id, settings.preview_rows)
     except FileNotFoundError as error:
         raise HTTPException(status_code=404, detail="File not found.") from error
     except Exception as error:  # pragma: no cover
         raise HTTPException(status_code=500, detail=f"Unable to read source file: {error}") from error
 
-    analysis = build_analysis(df, settings.preview_rows)
-    planning_result = services.llm_planner.create_plan(payload.prompt, analysis_for_llm(analysis))
+    planning_result = services.llm_planner.create_plan(payload.prompt, llm_analysis)
     return _to_plan_union(planning_result)
 
 
 @router.post("/plan/clarify", response_model=PlanUnion)
-def clarify_plan(payload: ClarifyRequest, request: Request) -> PlanUnion:
-    services = _services(request)
-    settings = request.app.state.settings
+def clarify_plan(payload: ClarifyRequest, services: ServicesDep, settings: SettingsDep) -> PlanUnion:
     try:
-        df = services.file_store.load_upload_df(payload.file_id)
+        _, llm_analysis = _source_analysis(services.file_store, payload.file_id, settings.preview_rows)
     except FileNotFoundError as error:
         raise HTTPException(status_code=404, detail="File not found.") from error
     except Exception as error:  # pragma: no cover
         raise HTTPException(status_code=500, detail=f"Unable to read source file: {error}") from error
 
-    analysis = build_analysis(df, settings.preview_rows)
     planning_result = services.llm_planner.create_plan_from_clarification(
         prompt=payload.prompt,
-        analysis=analysis_for_llm(analysis),
+        analysis=llm_analysis,
         clarify_id=payload.clarify_id,
         answer=payload.answer,
     )
@@ -169,10 +198,14 @@ def clarify_plan(payload: ClarifyRequest, request: Request) -> PlanUnion:
 
 
 @router.post("/transform", response_model=ApplyResponse)
-def apply_transform(payload: ApplyRequest, request: Request) -> ApplyResponse:
-    services = _services(request)
-    settings = request.app.state.settings
+def apply_transform(
+    payload: ApplyRequest,
+    services: ServicesDep,
+    settings: SettingsDep,
+    background_tasks: BackgroundTasks,
+) -> ApplyResponse:
     started = perf_counter()
+    plan = payload.plan
     file_size_bytes = _extract_file_size_bytes(services, payload.file_id)
     plan_tier = "free"  # Placeholder until billing tiers are implemented.
 
@@ -184,16 +217,16 @@ def apply_transform(payload: ApplyRequest, request: Request) -> ApplyResponse:
     analysis = None
 
     try:
-        operations = payload.plan.get("operations")
-        if not isinstance(operations, list) or len(operations) == 0:
+        operations = plan.get("operations")
+        if not isinstance(operations, list) or not operations:
             detail = EMPTY_PLAN_OPERATIONS_ERROR
-            clarification_question = payload.plan.get("clarification_question")
-            if isinstance(clarification_question, str) and clarification_question.strip():
-                detail = f"{detail} {clarification_question.strip()}"
+            clarification_question = _clarification_question(plan)
+            if clarification_question:
+                detail = f"{detail} {clarification_question}"
             error_code = "invalid_plan"
             raise HTTPException(status_code=400, detail=detail)
 
-        clarification_error = _clarification_guard(payload.plan)
+        clarification_error = _clarification_guard(plan)
         if clarification_error:
             error_code = "clarification_required"
             raise HTTPException(status_code=400, detail=clarification_error)
@@ -204,7 +237,7 @@ def apply_transform(payload: ApplyRequest, request: Request) -> ApplyResponse:
             raise HTTPException(status_code=429, detail=f"Free tier limit reached ({limit}/{limit}).")
 
         source_df = services.file_store.load_upload_df(payload.file_id)
-        transformed_df = apply_plan(source_df, payload.plan)
+        transformed_df = apply_plan(source_df, plan)
         result = services.file_store.save_result(
             transformed_df,
             source_file_id=payload.file_id,
@@ -214,27 +247,28 @@ def apply_transform(payload: ApplyRequest, request: Request) -> ApplyResponse:
         analysis = build_analysis(transformed_df, settings.preview_rows)
         status = "success"
         error_code = None
-    except FileNotFoundError as error:
-        error_code = "source_not_found"
-        raise HTTPException(status_code=404, detail="Source file not found.") from error
-    except TransformationError as error:
-        error_code = "invalid_plan"
-        raise HTTPException(status_code=400, detail=str(error)) from error
-    except ValueError as error:
-        error_code = "invalid_request"
-        raise HTTPException(status_code=400, detail=str(error)) from error
     except HTTPException as error:
         if error_code == "unknown":
             error_code = f"http_{error.status_code}"
         raise error
-    except Exception as error:  # pragma: no cover
-        error_code = "internal_error"
-        raise HTTPException(status_code=500, detail=f"Transformation failed: {error}") from error
+    except Exception as error:
+        mapped = _lookup_transform_error(error)
+        if mapped is None:  # pragma: no cover
+            error_code = "internal_error"
+            raise HTTPException(status_code=500, detail=f"Transformation failed: {error}") from error
+        error_code, status_code, detail = mapped
+        raise HTTPException(status_code=status_code, detail=detail or str(error)) from error
     finally:
         processing_ms = max(0, int((perf_counter() - started) * 1000))
-        services.analytics_logger.log_transform_event(
+        # Background tasks only run for successful responses, so failures are logged inline.
+        log_event = (
+            partial(background_tasks.add_task, services.analytics_logger.log_transform_event)
+            if status == "success"
+            else services.analytics_logger.log_transform_event
+        )
+        log_event(
             user_id=payload.user_id,
-            plan=payload.plan,
+            plan=plan,
             file_size_bytes=file_size_bytes,
             processing_ms=processing_ms,
             status=status,
@@ -256,16 +290,16 @@ def apply_transform(payload: ApplyRequest, request: Request) -> ApplyResponse:
 
 
 @router.post("/transform/preview", response_model=PreviewResponse)
-def preview_transform(payload: PreviewRequest, request: Request) -> PreviewResponse:
-    services = _services(request)
+def preview_transform(payload: PreviewRequest, services: ServicesDep) -> PreviewResponse:
+    plan = payload.plan
 
     try:
-        clarification_error = _clarification_guard(payload.plan)
+        clarification_error = _clarification_guard(plan)
         if clarification_error:
             raise HTTPException(status_code=400, detail=clarification_error)
 
         source_df = services.file_store.load_upload_df(payload.file_id)
-        transformed_df = apply_plan(source_df, payload.plan)
+        transformed_df = apply_plan(source_df, plan)
         analysis = build_analysis(transformed_df, preview_rows=10)
     except HTTPException as error:
         raise error
@@ -278,7 +312,7 @@ def preview_transform(payload: PreviewRequest, request: Request) -> PreviewRespo
     except Exception as error:  # pragma: no cover
         raise HTTPException(status_code=500, detail=f"Preview failed: {error}") from error
 
-    summary, steps, impacted_columns = explain_plan(payload.plan)
+    summary, steps, impacted_columns = explain_plan(plan)
     preview_available = len(analysis.preview) > 0
     return PreviewResponse(
         summary=summary,
@@ -290,16 +324,17 @@ def preview_transform(payload: PreviewRequest, request: Request) -> PreviewRespo
 
 
 @router.get("/results/{result_id}/download")
-def download_result(result_id: str, request: Request) -> FileResponse:
-    services = _services(request)
+def download_result(result_id: str, services: ServicesDep) -> FileResponse:
     try:
         metadata = services.file_store.get_result_meta(result_id)
         path = Path(metadata["stored_path"])
     except FileNotFoundError as error:
         raise HTTPException(status_code=404, detail="Result file not found.") from error
 
-    if not path.exists():
-        raise HTTPException(status_code=404, detail="Result file missing from disk.")
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError as error:
+        raise HTTPException(status_code=404, detail="Result file missing from disk.") from error
 
     media_type = (
         "text/csv"
@@ -310,4 +345,5 @@ def download_result(result_id: str, request: Request) -> FileResponse:
         path=path,
         media_type=media_type,
         filename=path.name,
+        stat_result=stat_result,
     )
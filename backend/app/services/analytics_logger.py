@@ -1,17 +1,56 @@
 from __future__ import annotations
 
 import hashlib
+import queue
 import sqlite3
 import threading
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from app.config import ensure_dir
+
+_CLEAN_OPS: frozenset[str] = frozenset(
+    {
+        "rename_column",
+        "drop_columns",
+        "fill_null",
+        "cast_type",
+        "trim_whitespace",
+        "change_case",
+    }
+)
+_ROW_OPS: frozenset[str] = frozenset({"filter_rows", "sort_rows"})
+ANALYTICS_QUEUE_MAX_EVENTS = 10_000
+FLUSH_POLL_SECONDS = 0.1
+
+_INSERT_EVENT_SQL = """
+INSERT INTO analytics_events (
+    created_at,
+    event_name,
+    user_id_hash,
+    plan_tier,
+    transformation_type,
+    operation_count,
+    file_size_bytes,
+    processing_ms,
+    status,
+    error_code,
+    output_format
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
 def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+@lru_cache(maxsize=4096)
+def _hash_user_id(user_id: str) -> str:
+    clean = user_id.strip().lower().encode("utf-8")
+    return hashlib.sha256(clean, usedforsecurity=False).hexdigest()[:16]
+
+
 def classify_transformation_type(plan: dict[str, Any]) -> str:
     operations = plan.get("operations")
     if not isinstance(operations, list) or not operations:
@@ -26,43 +65,49 @@ def classify_transformation_type(plan: dict[str, Any]) -> str:
     if not op_types:
         return "other"
 
-    if any(tag in op_type for op_type in op_types for tag in ("merge", "join")):
+    joined = "|".join(op_types)
+    if "merge" in joined or "join" in joined:
         return "merge"
 
-    if any(tag in op_type for op_type in op_types for tag in ("group", "aggregate")):
+    if "group" in joined or "aggregate" in joined:
         return "group"
 
-    clean_ops = {
-        "rename_column",
-        "drop_columns",
-        "fill_null",
-        "cast_type",
-        "trim_whitespace",
-        "change_case",
-    }
-    if op_types.issubset(clean_ops):
+    if op_types.issubset(_CLEAN_OPS):
         return "clean"
 
     if "derive_numeric" in op_types:
         return "group"
 
-    if op_types.intersection({"filter_rows", "sort_rows"}):
+    if op_types.intersection(_ROW_OPS):
         return "clean"
 
     return "mixed"
 
 
 class AnalyticsLogger:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        batch_size: int = 64,
+        max_queued_events: int = ANALYTICS_QUEUE_MAX_EVENTS,
+    ) -> None:
         self.db_path = db_path
-        self._lock = threading.Lock()
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._batch_size = batch_size
+        self._closed = False
+        self._queue: queue.Queue[tuple[Any, ...] | None] = queue.Queue(maxsize=max_queued_events)
+        ensure_dir(self.db_path.parent)
+        self._connection = sqlite3.connect(self.db_path, timeout=2.0, check_same_thread=False)
         self._init_db()
+        self._worker = threading.Thread(target=self._run, name="analytics-logger", daemon=True)
+        self._worker.start()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as connection:
+        connection = self._connection
+        with connection:
             connection.execute("PRAGMA journal_mode=WAL")
             connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=2000")
             connection.execute(
                 """
                 CREATE TABLE IF NOT EXISTS analytics_events (
@@ -93,12 +138,6 @@ class AnalyticsLogger:
             connection.execute(
                 "CREATE INDEX IF NOT EXISTS idx_analytics_events_tier ON analytics_events(plan_tier)"
             )
-            connection.commit()
-
-    @staticmethod
-    def _hash_user_id(user_id: str) -> str:
-        clean = user_id.strip().lower().encode("utf-8")
-        return hashlib.sha256(clean).hexdigest()[:16]
 
     @staticmethod
     def _operation_count(plan: dict[str, Any]) -> int:
@@ -119,40 +158,70 @@ class AnalyticsLogger:
         plan_tier: str,
         output_format: str | None,
     ) -> None:
+        if self._closed:
+            return
         try:
-            with self._lock:
-                with sqlite3.connect(self.db_path, timeout=2.0) as connection:
-                    connection.execute(
-                        """
-                        INSERT INTO analytics_events (
-                            created_at,
-                            event_name,
-                            user_id_hash,
-                            plan_tier,
-                            transformation_type,
-                            operation_count,
-                            file_size_bytes,
-                            processing_ms,
-                            status,
-                            error_code,
-                            output_format
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            _utcnow_iso(),
-                            "transform_job",
-                            self._hash_user_id(user_id),
-                            plan_tier,
-                            classify_transformation_type(plan),
-                            self._operation_count(plan),
-                            file_size_bytes,
-                            processing_ms,
-                            status,
-                            error_code,
-                            output_format,
-                        ),
-                    )
-                    connection.commit()
+            # A full queue drops the event instead of holding up the request.
+            self._queue.put_nowait(
+                (
+                    _utcnow_iso(),
+                    "transform_job",
+                    _hash_user_id(user_id),
+                    plan_tier,
+                    classify_transformation_type(plan),
+                    self._operation_count(plan),
+                    file_size_bytes,
+                    processing_ms,
+                    status,
+                    error_code,
+                    output_format,
+                )
+            )
         except Exception:
             # Analytics must never block the core product flow.
             return
+
+    def flush(self) -> None:
+        """Block until every queued event has been written, or return once the worker has stopped."""
+        all_tasks_done = self._queue.all_tasks_done
+        with all_tasks_done:
+            while self._queue.unfinished_tasks and self._worker.is_alive():
+                all_tasks_done.wait(FLUSH_POLL_SECONDS)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._connection.close()
+
+    def _run(self) -> None:
+        # The worker is the only writer after _init_db, so the shared connection needs no lock.
+        connection = self._connection
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [row for row in batch if row is not None]
+            try:
+                if rows:
+                    connection.executemany(_INSERT_EVENT_SQL, rows)
+                    connection.commit()
+            except Exception:
+                try:
+                    connection.rollback()
+                except Exception:
+                    # Dropping the batch keeps the worker alive for later events.
+                    pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if len(rows) != len(batch):
+                return
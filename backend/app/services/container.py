@@ -1,35 +1,69 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import logging
+import threading
+from dataclasses import dataclass, field
 
 from app.config import Settings
 from app.services.analytics_logger import AnalyticsLogger
 from app.services.file_store import FileStore
-from app.services.llm_planner import LLMPlanner
+from app.services.llm_planner import LLMPlanner, PlanCache
 from app.services.usage_limiter import UsageLimiter
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(slots=True)
 class ServiceContainer:
+    settings: Settings
     file_store: FileStore
     usage_limiter: UsageLimiter
-    llm_planner: LLMPlanner
     analytics_logger: AnalyticsLogger
+    _llm_planner: LLMPlanner | None = field(default=None, init=False, repr=False)
+    _llm_planner_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @property
+    def llm_planner(self) -> LLMPlanner:
+        # Built on first use so health checks and downloads never construct an LLM client.
+        if self._llm_planner is None:
+            with self._llm_planner_lock:
+                if self._llm_planner is None:
+                    self._llm_planner = _build_llm_planner(self.settings)
+        return self._llm_planner
+
+
+def _build_llm_planner(settings: Settings) -> LLMPlanner:
+    planner = LLMPlanner(
+        settings.llm_provider,
+        openai_api_key=settings.openai_api_key,
+        openai_model=settings.openai_model,
+        openai_base_url=settings.openai_base_url,
+        kimi_api_key=settings.kimi_api_key,
+        kimi_model=settings.kimi_model,
+        kimi_base_url=settings.kimi_base_url,
+        debug_llm=settings.debug_llm,
+        plan_cache=(
+            PlanCache(
+                max_entries=settings.plan_cache_max_entries,
+                ttl_seconds=settings.plan_cache_ttl_seconds,
+            )
+            if settings.plan_cache
+            else None
+        ),
+    )
+    logger.info(
+        "LLM provider configured: provider=%s model=%s base_url=%s",
+        planner.provider,
+        planner.model,
+        planner.base_url or "(default)",
+    )
+    return planner
 
 
 def build_services(settings: Settings) -> ServiceContainer:
     return ServiceContainer(
-        file_store=FileStore(settings.data_dir),
+        settings=settings,
+        file_store=FileStore(settings.data_dir, layout_pack=settings.layout_pack),
         usage_limiter=UsageLimiter(settings.usage_db_path, settings.max_free_uses),
-        llm_planner=LLMPlanner(
-            settings.llm_provider,
-            openai_api_key=settings.openai_api_key,
-            openai_model=settings.openai_model,
-            openai_base_url=settings.openai_base_url,
-            kimi_api_key=settings.kimi_api_key,
-            kimi_model=settings.kimi_model,
-            kimi_base_url=settings.kimi_base_url,
-            debug_llm=settings.debug_llm,
-        ),
         analytics_logger=AnalyticsLogger(settings.usage_db_path),
     )
@@ -1,27 +1,59 @@
 from __future__ import annotations
 
-import json
+import math
 import os
 import re
-import shutil
-from datetime import date, datetime, timezone
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
 from numbers import Number
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Hashable, TypeVar
 from uuid import uuid4
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import xlsxwriter
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+from pandas.errors import ParserError
 from fastapi import UploadFile
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
 
 
 ALLOWED_SUFFIXES = {".csv", ".xlsx"}
+UPLOAD_DF_CACHE_SIZE = 32
+UPLOAD_SIZE_CACHE_SIZE = 4096
+UPLOAD_ANALYSIS_CACHE_SIZE = 256
+CSV_QUOTED_CHARS = r'[,"\r\n]'
+UPLOAD_COPY_CHUNK_SIZE = 4 * 1024 * 1024
 LAYOUT_TEXT_KEYWORDS = {"telefono", "phone", "cell", "cf", "codice", "cap", "piva", "iban"}
 LAYOUT_DATE_KEYWORDS = {"data", "date"}
 LAYOUT_AMOUNT_KEYWORDS = {"importo", "totale", "amount", "€"}
+LAYOUT_HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "vcenter", "text_wrap": True}
+EXCEL_DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+EXCEL_DATE_FORMAT = "YYYY-MM-DD"
+
+_TEXT_CELL = (("num_format", "@"), ("valign", "vcenter"))
+_DATE_CELL = (("num_format", "DD/MM/YYYY"), ("valign", "vcenter"))
+_AMOUNT_CELL = (("num_format", "€ #,##0.00"), ("valign", "vcenter"))
+_AMOUNT_RIGHT_CELL = (*_AMOUNT_CELL, ("align", "right"))
+_PLAIN_CELL = (("valign", "vcenter"),)
+_PLAIN_RIGHT_CELL = (*_PLAIN_CELL, ("align", "right"))
+
+
+def _keyword_pattern(keywords: set[str]) -> re.Pattern[str]:
+    return re.compile("|".join(re.escape(keyword) for keyword in sorted(keywords)))
+
+
+_T = TypeVar("_T")
+
+_LAYOUT_TEXT_RE = _keyword_pattern(LAYOUT_TEXT_KEYWORDS)
+_LAYOUT_DATE_RE = _keyword_pattern(LAYOUT_DATE_KEYWORDS)
+_LAYOUT_AMOUNT_RE = _keyword_pattern(LAYOUT_AMOUNT_KEYWORDS)
 
 
 def _layout_pack_enabled() -> bool:
@@ -49,131 +81,260 @@ def _is_date_value(value: Any) -> bool:
     return isinstance(value, (date, datetime))
 
 
-def _header_bucket(header_value: Any) -> tuple[bool, bool, bool]:
-    text = str(header_value or "").strip().lower()
-    is_text = any(keyword in text for keyword in LAYOUT_TEXT_KEYWORDS)
-    is_date = any(keyword in text for keyword in LAYOUT_DATE_KEYWORDS)
-    is_amount = any(keyword in text for keyword in LAYOUT_AMOUNT_KEYWORDS)
-    return is_text, is_date, is_amount
+@lru_cache(maxsize=512)
+def _header_bucket(text: str) -> tuple[bool, bool, bool]:
+    return (
+        _LAYOUT_TEXT_RE.search(text) is not None,
+        _LAYOUT_DATE_RE.search(text) is not None,
+        _LAYOUT_AMOUNT_RE.search(text) is not None,
+    )
 
 
-def _last_non_empty_row(ws, max_col: int) -> int:
-    for row_idx in range(ws.max_row, 0, -1):
-        for col_idx in range(1, max_col + 1):
-            if _is_non_empty(ws.cell(row=row_idx, column=col_idx).value):
-                return row_idx
-    return 1
+def _present_mask(series: pd.Series) -> np.ndarray:
+    # Mirrors _is_non_empty for values read back from the sheet: missing values and "" are empty.
+    present = series.notna().to_numpy()
+    if series.dtype == object:
+        present &= (series != "").to_numpy()
+    return present
 
 
-def _last_non_empty_col(ws, max_row: int) -> int:
-    for col_idx in range(ws.max_column, 0, -1):
-        for row_idx in range(1, max_row + 1):
-            if _is_non_empty(ws.cell(row=row_idx, column=col_idx).value):
-                return col_idx
-    return 1
+def _value_mask(series: pd.Series, present: np.ndarray, dtype_check, value_check) -> np.ndarray:
+    if series.dtype != object:
+        return present if dtype_check(series.dtype) else np.zeros_like(present)
+    values = np.fromiter((value_check(value) for value in series.tolist()), dtype=bool, count=len(series))
+    return values & present
 
 
-def _table_name(ws, base_name: str = "ResultTable") -> str:
-    existing = set(ws.tables.keys())
-    if base_name not in existing:
-        return base_name
-    counter = 2
-    while f"{base_name}{counter}" in existing:
-        counter += 1
-    return f"{base_name}{counter}"
+def _is_numeric_column_dtype(dtype: Any) -> bool:
+    return is_numeric_dtype(dtype) and not is_bool_dtype(dtype)
 
 
-def apply_layout_pack(path: Path) -> None:
-    workbook = load_workbook(path)
-    worksheet = workbook.active
-
-    if worksheet.max_column <= 0:
-        workbook.save(path)
-        return
-
-    last_row = _last_non_empty_row(worksheet, worksheet.max_column)
-    last_col = _last_non_empty_col(worksheet, last_row)
-    if last_col <= 0:
-        workbook.save(path)
-        return
-
-    table_ref = f"A1:{get_column_letter(last_col)}{max(last_row, 1)}"
-
-    if last_row >= 2:
-        table = Table(displayName=_table_name(worksheet), ref=table_ref)
-        table.tableStyleInfo = TableStyleInfo(
-            name="TableStyleMedium9",
-            showFirstColumn=False,
-            showLastColumn=False,
-            showRowStripes=True,
-            showColumnStripes=False,
-        )
-        worksheet.add_table(table)
-
-    worksheet.auto_filter.ref = table_ref
-    worksheet.freeze_panes = "A2"
-
-    header_font = Font(bold=True)
-    for col_idx in range(1, last_col + 1):
-        header_cell = worksheet.cell(row=1, column=col_idx)
-        header_cell.font = header_font
-        header_cell.alignment = Alignment(
-            vertical="center",
-            horizontal=header_cell.alignment.horizontal,
-            wrap_text=True,
-        )
-    worksheet.row_dimensions[1].height = 24
-
-    for col_idx in range(1, last_col + 1):
-        header_value = worksheet.cell(row=1, column=col_idx).value
-        is_text_col, is_date_col, is_amount_col = _header_bucket(header_value)
-
-        max_len = len(str(header_value or ""))
-        non_empty_cells = 0
-        numeric_cells = 0
-        for row_idx in range(2, last_row + 1):
-            cell_value = worksheet.cell(row=row_idx, column=col_idx).value
-            if not _is_non_empty(cell_value):
-                continue
-            non_empty_cells += 1
-            max_len = max(max_len, len(str(cell_value)))
-            if _is_numeric_value(cell_value):
-                numeric_cells += 1
-
-        numeric_column = (
-            not is_text_col
-            and non_empty_cells > 0
-            and numeric_cells == non_empty_cells
-        )
-
-        col_letter = get_column_letter(col_idx)
-        worksheet.column_dimensions[col_letter].width = max(10, min(45, max_len + 2))
-
-        for row_idx in range(2, last_row + 1):
-            cell = worksheet.cell(row=row_idx, column=col_idx)
-            cell_value = cell.value
-            if not _is_non_empty(cell_value):
-                continue
-
-            cell.alignment = Alignment(
-                vertical="center",
-                horizontal="right" if numeric_column and _is_numeric_value(cell_value) else cell.alignment.horizontal,
-                wrap_text=cell.alignment.wrap_text,
+def _excel_value(value: Any) -> tuple[Any, str | None]:
+    # Same conversions as pandas' xlsxwriter export, so cells match a plain to_excel result.
+    if isinstance(value, (bool, int, str)):
+        return value, None
+    if isinstance(value, float):
+        if math.isinf(value):
+            return ("inf" if value > 0 else "-inf"), None
+        return value, None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            raise ValueError(
+                "Excel does not support datetimes with timezones. "
+                "Please ensure that datetimes are timezone unaware before writing to Excel."
             )
-
-            if is_text_col:
-                cell.number_format = "@"
-            elif is_date_col and _is_date_value(cell_value):
-                cell.number_format = "DD/MM/YYYY"
-            elif is_amount_col and _is_numeric_value(cell_value):
-                cell.number_format = "€ #,##0.00"
-
-    workbook.save(path)
+        return value, EXCEL_DATETIME_FORMAT
+    if isinstance(value, date):
+        return value, EXCEL_DATE_FORMAT
+    if isinstance(value, timedelta):
+        return value.total_seconds() / 86400, "0"
+    return str(value), None
+
+
+def write_layout_xlsx(path: Path, df: pd.DataFrame) -> None:
+    # Layout Pack formats are attached while the sheet is written, so the workbook is never re-opened.
+    column_series = [df.iloc[:, position] for position in range(df.shape[1])]
+    presence = [_present_mask(series) for series in column_series]
+    filled_rows = np.flatnonzero(np.logical_or.reduce(presence)) if presence else np.array([], dtype=int)
+    last_row = int(filled_rows[-1]) + 2 if filled_rows.size else 1
+    last_col = max(
+        (
+            position + 1
+            for position, (column, present) in enumerate(zip(df.columns, presence))
+            if _is_non_empty(column) or present[: last_row - 1].any()
+        ),
+        default=0,
+    )
+
+    with xlsxwriter.Workbook(str(path)) as workbook:
+        worksheet = workbook.add_worksheet("Sheet1")
+        if last_col == 0:
+            return
+
+        formats: dict[tuple[tuple[str, Any], ...], Any] = {}
+
+        def cell_format(properties: tuple[tuple[str, Any], ...]) -> Any:
+            cell_fmt = formats.get(properties)
+            if cell_fmt is None:
+                cell_fmt = formats[properties] = workbook.add_format(dict(properties))
+            return cell_fmt
+
+        header_format = workbook.add_format(LAYOUT_HEADER_FORMAT)
+        headers = [header if _is_non_empty(header) else "" for header in df.columns[:last_col]]
+        # Excel table headers are text and unique regardless of case; blank ones become "ColumnN".
+        table_headers = [str(header) or f"Column{col_idx + 1}" for col_idx, header in enumerate(headers)]
+        if last_row >= 2 and len({header.casefold() for header in table_headers}) == len(table_headers):
+            worksheet.add_table(
+                0,
+                0,
+                last_row - 1,
+                last_col - 1,
+                {
+                    "name": "ResultTable",
+                    "style": "Table Style Medium 9",
+                    "columns": [{"header": header, "header_format": header_format} for header in table_headers],
+                },
+            )
+        else:
+            # Colliding names cannot form a table; the header row is still written and filtered.
+            for col_idx, header in enumerate(headers):
+                worksheet.write(0, col_idx, _excel_value(header)[0], header_format)
+
+        worksheet.autofilter(0, 0, last_row - 1, last_col - 1)
+        worksheet.freeze_panes(1, 0)
+        worksheet.set_row(0, 24)
+
+        for col_idx, header_value in enumerate(headers):
+            header_text = str(header_value)
+            is_text_col, is_date_col, is_amount_col = _header_bucket(header_text.strip().lower())
+            series = column_series[col_idx].iloc[: last_row - 1]
+            present = presence[col_idx][: last_row - 1]
+            numeric = _value_mask(series, present, _is_numeric_column_dtype, _is_numeric_value)
+            dates = _value_mask(series, present, is_datetime64_any_dtype, _is_date_value)
+
+            present_rows = np.flatnonzero(present)
+            values = series.tolist()
+            max_len = max(
+                len(header_text),
+                max((len(str(values[row])) for row in present_rows), default=0),
+            )
+            numeric_column = (
+                not is_text_col
+                and present_rows.size > 0
+                and bool(numeric[present_rows].all())
+            )
+            worksheet.set_column(col_idx, col_idx, max(10, min(45, max_len + 2)))
+
+            for row in present_rows:
+                value, writer_format = _excel_value(values[row])
+                is_numeric = bool(numeric[row])
+                if is_text_col:
+                    properties = _TEXT_CELL
+                elif is_date_col and dates[row]:
+                    properties = _DATE_CELL
+                elif is_amount_col and is_numeric:
+                    properties = _AMOUNT_RIGHT_CELL if numeric_column else _AMOUNT_CELL
+                else:
+                    properties = _PLAIN_RIGHT_CELL if numeric_column and is_numeric else _PLAIN_CELL
+                    if writer_format is not None:
+                        properties = (*properties, ("num_format", writer_format))
+                worksheet.write(int(row) + 1, col_idx, value, cell_format(properties))
+
+
+def _kernel_copy_fileno(stream: BinaryIO) -> int | None:
+    if not hasattr(os, "copy_file_range"):
+        return None
+    # fileno() on an in-memory SpooledTemporaryFile would first spill it to disk.
+    if not getattr(stream, "_rolled", True):
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _copy_upload(source: BinaryIO, destination: BinaryIO) -> int:
+    source_fd = _kernel_copy_fileno(source)
+    if source_fd is not None:
+        written = 0
+        try:
+            while copied := os.copy_file_range(source_fd, destination.fileno(), UPLOAD_COPY_CHUNK_SIZE):
+                written += copied
+            return written
+        except OSError:
+            # Some filesystem pairs reject copy_file_range; restart with a userspace copy.
+            source.seek(0)
+            destination.seek(0)
+            destination.truncate()
+
+    written = 0
+    while chunk := source.read(UPLOAD_COPY_CHUNK_SIZE):
+        destination.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def _needs_csv_quoting(values: pa.ChunkedArray) -> bool:
+    return bool(pc.any(pc.match_substring_regex(values, CSV_QUOTED_CHARS)).as_py())
+
+
+def _arrow_csv_table(df: pd.DataFrame) -> pa.Table | None:
+    # Only frames whose Arrow rendering is byte-identical to to_csv: integer and plain-text columns, no
+    # value that the csv module would quote, and more than one column (a lone empty field is written as "").
+    if os.linesep != "\n" or df.shape[1] < 2:
+        return None
+    if not all(isinstance(column, str) and re.search(CSV_QUOTED_CHARS, column) is None for column in df.columns):
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (ValueError, TypeError, NotImplementedError):
+        return None
+    for field, values in zip(table.schema, table.columns):
+        if pa.types.is_integer(field.type) or pa.types.is_null(field.type):
+            continue
+        if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            return None
+        if _needs_csv_quoting(values):
+            return None
+    return table
+
+
+def _write_result_csv(df: pd.DataFrame, path: Path) -> None:
+    table = _arrow_csv_table(df)
+    if table is None:
+        df.to_csv(path, index=False)
+        return
+    # Arrow always quotes header names, so the header line is written here.
+    with path.open("wb") as handle:
+        handle.write(",".join(df.columns).encode("utf-8") + b"\n")
+        pa_csv.write_csv(table, handle, pa_csv.WriteOptions(include_header=False, quoting_style="none"))
+
+
+def _parquet_sidecar_path(stored_path: str) -> Path:
+    return Path(stored_path).with_suffix(".parquet")
+
+
+def _has_temporal_columns(df: pd.DataFrame) -> bool:
+    for position, dtype in enumerate(df.dtypes):
+        if dtype.kind in "Mm":
+            return True
+        if dtype == object:
+            series = df.iloc[:, position]
+            first_valid = series.first_valid_index()
+            if first_valid is not None and isinstance(series.loc[first_valid], (date, time)):
+                return True
+    return False
+
+
+@lru_cache(maxsize=UPLOAD_DF_CACHE_SIZE)
+def _read_upload_df(stored_path: str, suffix: str, mtime_ns: int) -> pd.DataFrame:
+    # mtime_ns only takes part in the cache key, so a rewritten upload is parsed again.
+    try:
+        return pd.read_parquet(_parquet_sidecar_path(stored_path))
+    except FileNotFoundError:
+        pass
+    if suffix == ".csv":
+        try:
+            df = pd.read_csv(stored_path, engine="pyarrow")
+        except ParserError:
+            # Arrow rejects ragged rows that the C parser pads with NaN.
+            return pd.read_csv(stored_path)
+        if _has_temporal_columns(df):
+            # Arrow infers dates and times that the C parser keeps as the original text.
+            return pd.read_csv(stored_path)
+        if not df.columns.is_unique or "" in df.columns:
+            # Only the C parser renames duplicate ("a.1") and blank ("Unnamed: 2") headers.
+            return pd.read_csv(stored_path)
+        return df
+    if suffix == ".xlsx":
+        return pd.read_excel(stored_path, engine="calamine")
+    raise ValueError("Unsupported file format in metadata.")
 
 
 class FileStore:
-    def __init__(self, data_dir: Path) -> None:
+    def __init__(self, data_dir: Path, *, layout_pack: bool | None = None) -> None:
         self.data_dir = data_dir
+        self.layout_pack = _layout_pack_enabled() if layout_pack is None else layout_pack
         self.upload_dir = self.data_dir / "uploads"
         self.result_dir = self.data_dir / "results"
         self.upload_meta_dir = self.data_dir / "meta" / "uploads"
@@ -185,6 +346,10 @@ class FileStore:
             self.result_meta_dir,
         ):
             directory.mkdir(parents=True, exist_ok=True)
+        self._upload_sizes: OrderedDict[str, int] = OrderedDict()
+        self._upload_sizes_lock = threading.Lock()
+        self._upload_analyses: OrderedDict[tuple[str, int, Hashable], Any] = OrderedDict()
+        self._upload_analyses_lock = threading.Lock()
 
     def save_upload(self, upload: UploadFile) -> dict[str, Any]:
         filename = upload.filename or "dataset.csv"
@@ -197,19 +362,55 @@ class FileStore:
         stored_path = self.upload_dir / stored_filename
 
         with stored_path.open("wb") as destination:
-            shutil.copyfileobj(upload.file, destination)
+            file_size_bytes = _copy_upload(upload.file, destination)
 
         metadata = {
             "file_id": file_id,
             "filename": _safe_name(filename),
             "suffix": suffix,
             "stored_path": str(stored_path),
-            "file_size_bytes": int(stored_path.stat().st_size),
+            "file_size_bytes": file_size_bytes,
             "created_at": _utcnow_iso(),
         }
         self._write_json(self.upload_meta_dir / f"{file_id}.json", metadata)
+        self._remember_upload_size(file_id, file_size_bytes)
+        self._write_upload_sidecar(metadata)
         return metadata
 
+    def get_upload_size(self, file_id: str) -> int | None:
+        with self._upload_sizes_lock:
+            cached = self._upload_sizes.get(file_id)
+            if cached is not None:
+                self._upload_sizes.move_to_end(file_id)
+                return cached
+
+        metadata = self.get_upload_meta(file_id)
+        raw_size = metadata.get("file_size_bytes")
+        if isinstance(raw_size, int):
+            size = max(0, raw_size)
+        elif isinstance(raw_size, str) and raw_size.isdigit():
+            size = int(raw_size)
+        else:
+            stored_path = metadata.get("stored_path")
+            if not isinstance(stored_path, str):
+                return None
+            try:
+                size = int(os.stat(stored_path).st_size)
+            except OSError:
+                return None
+            metadata["file_size_bytes"] = size
+            self._write_json(self.upload_meta_dir / f"{file_id}.json", metadata)
+
+        self._remember_upload_size(file_id, size)
+        return size
+
+    def _remember_upload_size(self, file_id: str, size: int) -> None:
+        with self._upload_sizes_lock:
+            self._upload_sizes[file_id] = size
+            self._upload_sizes.move_to_end(file_id)
+            while len(self._upload_sizes) > UPLOAD_SIZE_CACHE_SIZE:
+                self._upload_sizes.popitem(last=False)
+
     def get_upload_meta(self, file_id: str) -> dict[str, Any]:
         return self._read_json(self.upload_meta_dir / f"{file_id}.json")
 
@@ -217,17 +418,40 @@ class FileStore:
         return self._read_json(self.result_meta_dir / f"{result_id}.json")
 
     def load_upload_df(self, file_id: str) -> pd.DataFrame:
+        # The returned frame is shared through the parse cache; callers must not mutate it.
+        return _read_upload_df(*self._upload_source(file_id))
+
+    def upload_analysis(self, file_id: str, key: Hashable, build: Callable[[pd.DataFrame], _T]) -> _T:
+        # Keyed like the parse cache, so a removed or rewritten upload is never answered from memory.
+        stored_path, suffix, mtime_ns = self._upload_source(file_id)
+        cache_key = (stored_path, mtime_ns, key)
+        with self._upload_analyses_lock:
+            if cache_key in self._upload_analyses:
+                self._upload_analyses.move_to_end(cache_key)
+                return self._upload_analyses[cache_key]
+        result = build(_read_upload_df(stored_path, suffix, mtime_ns))
+        with self._upload_analyses_lock:
+            self._upload_analyses[cache_key] = result
+            while len(self._upload_analyses) > UPLOAD_ANALYSIS_CACHE_SIZE:
+                self._upload_analyses.popitem(last=False)
+        return result
+
+    def _upload_source(self, file_id: str) -> tuple[str, str, int]:
         meta = self.get_upload_meta(file_id)
-        path = Path(meta["stored_path"])
-        if not path.exists():
-            raise FileNotFoundError(f"Upload not found for file_id={file_id}")
-
-        suffix = meta["suffix"]
-        if suffix == ".csv":
-            return pd.read_csv(path)
-        if suffix == ".xlsx":
-            return pd.read_excel(path, engine="openpyxl")
-        raise ValueError("Unsupported file format in metadata.")
+        stored_path = meta["stored_path"]
+        try:
+            mtime_ns = os.stat(stored_path).st_mtime_ns
+        except FileNotFoundError as error:
+            raise FileNotFoundError(f"Upload not found for file_id={file_id}") from error
+        return stored_path, meta["suffix"], mtime_ns
+
+    def _write_upload_sidecar(self, metadata: dict[str, Any]) -> None:
+        df = self.load_upload_df(metadata["file_id"])
+        try:
+            df.to_parquet(_parquet_sidecar_path(metadata["stored_path"]), compression="zstd")
+        except (ValueError, TypeError, NotImplementedError, OSError):
+            # Mixed-type object columns cannot be stored as Parquet; those uploads are re-parsed instead.
+            return
 
     def save_result(
         self,
@@ -243,11 +467,12 @@ class FileStore:
         result_path = self.result_dir / f"{result_id}{suffix}"
 
         if output_format == "csv":
-            df.to_csv(result_path, index=False)
+            _write_result_csv(df, result_path)
         else:
-            df.to_excel(result_path, index=False)
-            if _layout_pack_enabled():
-                apply_layout_pack(result_path)
+            if self.layout_pack:
+                write_layout_xlsx(result_path, df)
+            else:
+                df.to_excel(result_path, index=False, engine="xlsxwriter")
 
         metadata = {
             "result_id": result_id,
@@ -261,10 +486,12 @@ class FileStore:
 
     @staticmethod
     def _read_json(path: Path) -> dict[str, Any]:
-        if not path.exists():
-            raise FileNotFoundError(path.name)
-        return json.loads(path.read_text(encoding="utf-8"))
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError as error:
+            raise FileNotFoundError(path.name) from error
+        return orjson.loads(raw)
 
     @staticmethod
     def _write_json(path: Path, payload: dict[str, Any]) -> None:
-        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
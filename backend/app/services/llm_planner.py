@@ -1,49 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Final, Iterable
 from uuid import uuid4
 
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI, OpenAI
 
-from app.services.transformer import SUPPORTED_OPERATIONS
+from app.services.transformer import OPERATION_FIELDS
 
 
 logger = logging.getLogger(__name__)
 
+_VALID_PROVIDERS: frozenset[str] = frozenset({"openai", "kimi"})
+
+CLARIFY_MAX_CHOICES = 4
 GENERIC_CLARIFY_QUESTION = "La richiesta non e ancora chiara. Vuoi procedere con impostazioni consigliate?"
 GENERIC_CLARIFY_CHOICES = [
     "Si, usa impostazioni consigliate",
     "No, preferisco specificare meglio",
 ]
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_CUSTOM_ID_PREFIX = "plan-"
+BATCH_FINAL_STATUSES: frozenset[str] = frozenset({"completed", "expired", "cancelled", "failed"})
+
 SYSTEM_PROMPT = """You are an expert data transformation planner.
-Return ONLY valid JSON and ONLY one of these two shapes:
-
-1) Plan:
-{
-  "type": "plan",
-  "plan": {
-    "operations": [
-      {
-        "type": "operation_name",
-        "...": "operation specific fields"
-      }
-    ]
-  }
-}
-
-2) Clarify:
-{
-  "type": "clarify",
-  "question": "single concise question",
-  "choices": ["option A", "option B"],
-  "clarify_id": "optional-id"
-}
+Return ONLY valid JSON (no markdown, no prose) and ONLY one of these two shapes:
+1) Plan: {"type":"plan","plan":{"operations":[{"type":"operation_name","...":"operation specific fields"}]}}
+2) Clarify: {"type":"clarify","question":"single concise question","choices":["option A","option B"],"clarify_id":"optional-id"}
 
 Rules:
-- Return JSON only. No markdown. No prose.
 - Use only supported operation types.
 - If request is ambiguous or non-deterministic, return type="clarify".
 - For type="plan", operations must be non-empty and deterministic.
@@ -58,10 +52,88 @@ Supported operations:
 - change_case: {"type":"change_case","columns":["col"],"case":"upper|lower|title"}
 - derive_numeric: {"type":"derive_numeric","left_column":"a","right_column":"b","new_column":"c","operator":"add|sub|mul|div","round":2}
 - filter_rows: {"type":"filter_rows","column":"col","comparator":"eq|neq|gt|gte|lt|lte","value":100}
-- sort_rows: {"type":"sort_rows","by":["col"],"ascending":true}
+- sort_rows: {"type":"sort_rows","by":["col"],"ascending":true} (optional "limit":N keeps only the first N rows)
 """
 
 
+# Shared across requests; the OpenAI client only reads message dicts.
+_SYSTEM_MESSAGE: Final[dict[str, str]] = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+def _loads_json(raw: str | bytes | memoryview) -> Any:
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # orjson is strict RFC 8259; the stdlib also accepts NaN/Infinity literals some models emit.
+        return json.loads(bytes(raw) if isinstance(raw, memoryview) else raw)
+
+
+def _json_completion_content(payload: dict[str, Any]) -> tuple[str, int | None]:
+    choices = payload.get("choices") or [{}]
+    usage_details = (payload.get("usage") or {}).get("prompt_tokens_details") or {}
+    return (choices[0].get("message") or {}).get("content") or "", usage_details.get("cached_tokens")
+
+
+def _batch_record_content(line: str) -> tuple[int, str] | None:
+    try:
+        record = _loads_json(line)
+        index = int(str(record.get("custom_id", "")).removeprefix(BATCH_CUSTOM_ID_PREFIX))
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            return None
+        llm_raw, _ = _json_completion_content(response.get("body") or {})
+    except (ValueError, TypeError, AttributeError, IndexError):
+        # Malformed output lines are skipped; their slots fall back to the clarify response.
+        return None
+    return (index, llm_raw) if isinstance(llm_raw, str) else None
+
+
+def _raw_completion_content(response: Any) -> tuple[str, int | None]:
+    # Raw responses skip the SDK's pydantic models; status errors and retries are still handled by the SDK.
+    return _json_completion_content(orjson.loads(response.content))
+
+
+@lru_cache(maxsize=8)
+def _shared_client(api_key: str, base_url: str | None) -> OpenAI:
+    # One connection pool per credentials/endpoint pair. Async clients are not shared:
+    # their pools are bound to the event loop that first used them.
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
+class PlanCache:
+    def __init__(self, *, max_entries: int = 256, ttl_seconds: float = 900.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str, str | None], tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt: str, analysis_json: str, answer: str | None) -> tuple[str, str, str | None]:
+        # Exact match only: column names are case-sensitive, so prompts differing in case may need different plans.
+        analysis_digest = hashlib.sha256(analysis_json.encode("utf-8")).hexdigest()
+        return analysis_digest, prompt.strip(), answer.strip() if answer else None
+
+    def get(self, key: tuple[str, str, str | None]) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return orjson.loads(payload)
+
+    def put(self, key: tuple[str, str, str | None], result: dict[str, Any]) -> None:
+        payload = orjson.dumps(result)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
 class LLMPlanner:
     def __init__(
         self,
@@ -74,21 +146,27 @@ class LLMPlanner:
         kimi_model: str,
         kimi_base_url: str,
         debug_llm: bool = False,
+        plan_cache: PlanCache | None = None,
     ) -> None:
         normalized_provider = provider.strip().lower() if provider else "openai"
-        self._provider = normalized_provider if normalized_provider in {"openai", "kimi"} else "openai"
+        self._provider = normalized_provider if normalized_provider in _VALID_PROVIDERS else "openai"
         self._debug_llm = debug_llm
+        self._plan_cache = plan_cache
+        self._analysis_json: tuple[dict[str, Any], str] | None = None
 
         if self._provider == "kimi":
             self._api_key = kimi_api_key
             self._model = kimi_model
             self._base_url = kimi_base_url
-            self._client = OpenAI(api_key=kimi_api_key, base_url=kimi_base_url) if kimi_api_key else None
         else:
             self._api_key = openai_api_key
             self._model = openai_model
             self._base_url = openai_base_url
-            self._client = OpenAI(api_key=openai_api_key, base_url=openai_base_url) if openai_api_key else None
+
+        if self._api_key:
+            self._client = _shared_client(self._api_key, self._base_url)
+        else:
+            self._client = None
 
     @property
     def provider(self) -> str:
@@ -120,6 +198,112 @@ class LLMPlanner:
             answer=answer,
         )
 
+    async def create_plan_many(
+        self,
+        items: Iterable[tuple[str, dict[str, Any]]],
+        *,
+        concurrency: int = 20,
+    ) -> list[dict[str, Any]]:
+        semaphore = asyncio.Semaphore(concurrency)
+        aclient = self._new_async_client()
+
+        async def _one(prompt: str, analysis: dict[str, Any]) -> dict[str, Any]:
+            async with semaphore:
+                return await self._acreate_plan_internal(
+                    aclient,
+                    prompt=prompt,
+                    analysis=analysis,
+                    clarify_id=None,
+                    answer=None,
+                )
+
+        try:
+            results = await asyncio.gather(
+                *(_one(prompt, analysis) for prompt, analysis in items),
+                return_exceptions=True,
+            )
+        finally:
+            if aclient is not None:
+                await aclient.close()
+        return [
+            self._failure_response(result, clarify_id=None) if isinstance(result, BaseException) else result
+            for result in results
+        ]
+
+    def _new_async_client(self) -> AsyncOpenAI | None:
+        # Async connection pools are bound to the running event loop, so each fan-out gets its own client.
+        if not self._api_key:
+            return None
+        return AsyncOpenAI(api_key=self._api_key, base_url=self._base_url)
+
+    def submit_batch(self, items: Iterable[tuple[str, dict[str, Any]]]) -> str:
+        if self._client is None:
+            raise RuntimeError("LLM client non configurato.")
+
+        lines = [
+            orjson.dumps(
+                {
+                    "custom_id": f"{BATCH_CUSTOM_ID_PREFIX}{index}",
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self._completion_kwargs(
+                        prompt=prompt,
+                        analysis=analysis,
+                        clarify_id=None,
+                        answer=None,
+                    ),
+                }
+            )
+            for index, (prompt, analysis) in enumerate(items)
+        ]
+        input_file = self._client.files.create(
+            file=("plans.jsonl", b"\n".join(lines)),
+            purpose="batch",
+        )
+        batch = self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        logger.info(
+            "LLM plan batch submitted: provider=%s batch_id=%s requests=%s",
+            self._provider,
+            batch.id,
+            len(lines),
+        )
+        return batch.id
+
+    def fetch_batch(self, batch_id: str) -> list[dict[str, Any]] | None:
+        if self._client is None:
+            raise RuntimeError("LLM client non configurato.")
+
+        batch = self._client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_FINAL_STATUSES:
+            return None
+
+        total = batch.request_counts.total if batch.request_counts is not None else 0
+        results: list[dict[str, Any] | None] = [None] * total
+        if batch.output_file_id:
+            output = self._client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                parsed = _batch_record_content(line)
+                if parsed is None or not 0 <= parsed[0] < total:
+                    continue
+                results[parsed[0]] = self._normalize_llm_output(parsed[1], clarify_id=None)
+
+        return [
+            result
+            if result is not None
+            else self._clarify_response(
+                question=GENERIC_CLARIFY_QUESTION,
+                choices=GENERIC_CLARIFY_CHOICES,
+                clarify_id=None,
+            )
+            for result in results
+        ]
+
     def _create_plan_internal(
         self,
         *,
@@ -128,6 +312,59 @@ class LLMPlanner:
         clarify_id: str | None,
         answer: str | None,
     ) -> dict[str, Any]:
+        cache_key, early_result = self._before_request(
+            client=self._client,
+            prompt=prompt,
+            analysis=analysis,
+            clarify_id=clarify_id,
+            answer=answer,
+        )
+        if early_result is not None:
+            return early_result
+
+        body = self._completion_kwargs(prompt=prompt, analysis=analysis, clarify_id=clarify_id, answer=answer)
+        try:
+            completion = _raw_completion_content(self._client.chat.completions.with_raw_response.create(**body))
+        except Exception as error:  # pragma: no cover - external API variability
+            return self._failure_response(error, clarify_id=clarify_id)
+        return self._handle_completion(*completion, cache_key=cache_key, clarify_id=clarify_id)
+
+    async def _acreate_plan_internal(
+        self,
+        aclient: AsyncOpenAI | None,
+        *,
+        prompt: str,
+        analysis: dict[str, Any],
+        clarify_id: str | None,
+        answer: str | None,
+    ) -> dict[str, Any]:
+        cache_key, early_result = self._before_request(
+            client=aclient,
+            prompt=prompt,
+            analysis=analysis,
+            clarify_id=clarify_id,
+            answer=answer,
+        )
+        if early_result is not None:
+            return early_result
+
+        body = self._completion_kwargs(prompt=prompt, analysis=analysis, clarify_id=clarify_id, answer=answer)
+        try:
+            response = await aclient.chat.completions.with_raw_response.create(**body)
+            completion = _raw_completion_content(response)
+        except Exception as error:  # pragma: no cover - external API variability
+            return self._failure_response(error, clarify_id=clarify_id)
+        return self._handle_completion(*completion, cache_key=cache_key, clarify_id=clarify_id)
+
+    def _before_request(
+        self,
+        *,
+        client: Any,
+        prompt: str,
+        analysis: dict[str, Any],
+        clarify_id: str | None,
+        answer: str | None,
+    ) -> tuple[tuple[str, str, str | None] | None, dict[str, Any] | None]:
         logger.info(
             "LLM plan request start: provider=%s model=%s base_url=%s",
             self._provider,
@@ -135,108 +372,138 @@ class LLMPlanner:
             self._base_url or "(default)",
         )
 
-        fallback_triggered = False
-        if self._client is None:
-            fallback_triggered = True
-            logger.info(
-                "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
-                self._provider,
-                self._model,
-                fallback_triggered,
-            )
-            return self._clarify_response(
+        if client is None:
+            self._log_fallback(True)
+            return None, self._clarify_response(
                 question=GENERIC_CLARIFY_QUESTION,
                 choices=GENERIC_CLARIFY_CHOICES,
                 clarify_id=clarify_id,
             )
 
-        llm_raw = ""
+        if self._plan_cache is None:
+            return None, None
+        cache_key = self._plan_cache.make_key(prompt, self._analysis_message(analysis), answer)
+        cached = self._plan_cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM plan cache hit: provider=%s model=%s", self._provider, self._model)
+        return cache_key, cached
+
+    def _analysis_message(self, analysis: dict[str, Any]) -> str:
+        # Plan and clarify calls for one upload receive the same cached analysis object,
+        # so its serialized form is reused until a different analysis comes in.
+        cached = self._analysis_json
+        if cached is not None and cached[0] is analysis:
+            return cached[1]
+        analysis_json = orjson.dumps(
+            {"dataset_analysis": analysis},
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+        self._analysis_json = (analysis, analysis_json)
+        return analysis_json
+
+    def _completion_kwargs(
+        self,
+        *,
+        prompt: str,
+        analysis: dict[str, Any],
+        clarify_id: str | None,
+        answer: str | None,
+    ) -> dict[str, Any]:
+        return {
+            "model": self._model,
+            "response_format": {"type": "json_object"},
+            # Static content first so providers can reuse the cached prompt prefix across requests.
+            "messages": [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": self._analysis_message(analysis)},
+                {
+                    "role": "user",
+                    "content": orjson.dumps(
+                        {
+                            "prompt": prompt,
+                            "clarification": (
+                                {"clarify_id": clarify_id, "answer": answer}
+                                if clarify_id and answer
+                                else None
+                            ),
+                        }
+                    ).decode(),
+                },
+            ],
+            "temperature": 1 if self._provider == "kimi" else 0.1,
+        }
+
+    def _handle_completion(
+        self,
+        llm_raw: str,
+        cached_tokens: int | None,
+        *,
+        cache_key: tuple[str, str, str | None] | None,
+        clarify_id: str | None,
+    ) -> dict[str, Any]:
         try:
-            response = self._client.chat.completions.create(
-                model=self._model,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {
-                        "role": "user",
-                        "content": json.dumps(
-                            {
-                                "prompt": prompt,
-                                "dataset_analysis": analysis,
-                                "clarification": (
-                                    {"clarify_id": clarify_id, "answer": answer}
-                                    if clarify_id and answer
-                                    else None
-                                ),
-                            }
-                        ),
-                    },
-                ],
-                temperature=1 if self._provider == "kimi" else 0.1,
-            )
-            llm_raw = response.choices[0].message.content or ""
-            if self._debug_llm:
+            if self._log_raw_output():
                 logger.debug("LLM raw output: %s", llm_raw)
+                logger.debug("LLM cached prompt tokens: %s", cached_tokens)
 
-            parsed = self._parse_json_payload(llm_raw)
-            if not isinstance(parsed, dict):
-                fallback_triggered = True
-                logger.info(
-                    "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
-                    self._provider,
-                    self._model,
-                    fallback_triggered,
-                )
-                return self._clarify_response(
-                    question=GENERIC_CLARIFY_QUESTION,
-                    choices=GENERIC_CLARIFY_CHOICES,
-                    clarify_id=clarify_id,
-                )
-
-            normalized = self._normalize_llm_payload(parsed, llm_raw=llm_raw, clarify_id=clarify_id)
-            logger.info(
-                "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
-                self._provider,
-                self._model,
-                fallback_triggered,
-            )
+            normalized = self._normalize_llm_output(llm_raw, clarify_id=clarify_id)
+            if cache_key is not None and normalized["type"] == "plan":
+                self._plan_cache.put(cache_key, normalized)
             return normalized
         except Exception as error:  # pragma: no cover - external API variability
-            upstream_status = self._extract_status_code(error)
-            logger.warning(
-                "LLM planner failure: provider=%s model=%s upstream_status=%s error=%s",
-                self._provider,
-                self._model,
-                upstream_status,
-                str(error),
-            )
-            if upstream_status in {401, 403}:
-                fallback_triggered = True
-                logger.info(
-                    "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
-                    self._provider,
-                    self._model,
-                    fallback_triggered,
-                )
-                return self._clarify_response(
-                    question="Non riesco ad autenticarmi al provider LLM. Vuoi riprovare con un prompt piu specifico?",
-                    choices=["Riprova ora", "Modifica prompt"],
-                    clarify_id=clarify_id,
-                )
+            return self._failure_response(error, clarify_id=clarify_id)
 
-            fallback_triggered = True
-            logger.info(
-                "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
-                self._provider,
-                self._model,
-                fallback_triggered,
-            )
+    def _normalize_llm_output(self, llm_raw: str, *, clarify_id: str | None) -> dict[str, Any]:
+        parsed = self._parse_json_payload(llm_raw)
+        if not isinstance(parsed, dict):
+            self._log_fallback(True)
             return self._clarify_response(
                 question=GENERIC_CLARIFY_QUESTION,
                 choices=GENERIC_CLARIFY_CHOICES,
                 clarify_id=clarify_id,
             )
 
+        normalized = self._normalize_llm_payload(parsed, llm_raw=llm_raw, clarify_id=clarify_id)
+        self._log_fallback(False)
+        return normalized
+
+    def _failure_response(self, error: BaseException, *, clarify_id: str | None) -> dict[str, Any]:
+        upstream_status = self._extract_status_code(error)
+        logger.warning(
+            "LLM planner failure: provider=%s model=%s upstream_status=%s error=%s",
+            self._provider,
+            self._model,
+            upstream_status,
+            str(error),
+        )
+        self._log_fallback(True)
+        if upstream_status in {401, 403}:
+            return self._clarify_response(
+                question="Non riesco ad autenticarmi al provider LLM. Vuoi riprovare con un prompt piu specifico?",
+                choices=["Riprova ora", "Modifica prompt"],
+                clarify_id=clarify_id,
+            )
+
+        return self._clarify_response(
+            question=GENERIC_CLARIFY_QUESTION,
+            choices=GENERIC_CLARIFY_CHOICES,
+            clarify_id=clarify_id,
+        )
+
+    def _log_raw_output(self) -> bool:
+        # DEBUG_LLM opts in to logging raw model output; the level check skips formatting when DEBUG is off.
+        return self._debug_llm and logger.isEnabledFor(logging.DEBUG)
+
+    def _log_fallback(self, fallback_triggered: bool) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info(
+            "LLM fallback triggered: provider=%s model=%s has_fallback=%s",
+            self._provider,
+            self._model,
+            fallback_triggered,
+        )
+
     def _normalize_llm_payload(
         self,
         payload: dict[str, Any],
@@ -267,7 +534,7 @@ class LLMPlanner:
                     "warnings": [],
                 }
 
-            if self._debug_llm:
+            if self._log_raw_output():
                 logger.debug("LLM returned empty plan payload: %s", self._truncate(llm_raw, limit=500))
             return self._clarify_response(
                 question=GENERIC_CLARIFY_QUESTION,
@@ -275,7 +542,7 @@ class LLMPlanner:
                 clarify_id=clarify_id,
             )
 
-        if self._debug_llm:
+        if self._log_raw_output():
             logger.debug("LLM payload without valid type: %s", self._truncate(llm_raw, limit=500))
         return self._clarify_response(
             question=GENERIC_CLARIFY_QUESTION,
@@ -293,7 +560,7 @@ class LLMPlanner:
         return {
             "type": "clarify",
             "question": question.strip(),
-            "choices": choices[:4],
+            "choices": choices,
             "clarify_id": clarify_id.strip() if isinstance(clarify_id, str) and clarify_id.strip() else uuid4().hex,
         }
 
@@ -303,8 +570,13 @@ class LLMPlanner:
             return []
         choices: list[str] = []
         for choice in raw_choices:
-            if isinstance(choice, str) and choice.strip():
-                choices.append(choice.strip())
+            if not isinstance(choice, str):
+                continue
+            stripped = choice.strip()
+            if stripped:
+                choices.append(stripped)
+                if len(choices) == CLARIFY_MAX_CHOICES:
+                    break
         return choices
 
     @staticmethod
@@ -320,23 +592,24 @@ class LLMPlanner:
 
     @staticmethod
     def _parse_json_payload(raw_content: str) -> dict[str, Any] | None:
+        encoded = raw_content.encode("utf-8")
         try:
-            parsed = json.loads(raw_content)
+            parsed = _loads_json(encoded)
             return parsed if isinstance(parsed, dict) else None
         except Exception:
             pass
 
-        if not raw_content:
+        if not encoded:
             return None
 
-        start = raw_content.find("{")
-        end = raw_content.rfind("}")
+        start = encoded.find(b"{")
+        end = encoded.rfind(b"}")
         if start == -1 or end == -1 or end <= start:
             return None
 
-        candidate = raw_content[start : end + 1]
+        candidate = memoryview(encoded)[start : end + 1]
         try:
-            parsed = json.loads(candidate)
+            parsed = _loads_json(candidate)
             return parsed if isinstance(parsed, dict) else None
         except Exception:
             return None
@@ -361,8 +634,11 @@ class LLMPlanner:
             if not isinstance(operation, dict):
                 continue
             op_type = operation.get("type")
-            if op_type not in SUPPORTED_OPERATIONS:
+            fields = OPERATION_FIELDS.get(op_type) if isinstance(op_type, str) else None
+            if fields is None:
                 continue
-            safe_operations.append(operation)
+            safe_operation = {"type": op_type}
+            safe_operation.update((field, operation[field]) for field in fields if field in operation)
+            safe_operations.append(safe_operation)
 
         return {"operations": safe_operations}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 
 def _as_list(value: Any) -> list[str]:
@@ -9,90 +9,101 @@ def _as_list(value: Any) -> list[str]:
     return [str(item) for item in value if isinstance(item, str) and item.strip()]
 
 
-def _describe_step(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
-    op_type = operation.get("type")
+def _describe_rename_column(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    source = str(operation.get("from", ""))
+    target = str(operation.get("to", ""))
+    return (
+        "Rinomina colonna",
+        f"La colonna '{source}' verra rinominata in '{target}'.",
+        [source, target],
+    )
 
-    if op_type == "rename_column":
-        source = str(operation.get("from", ""))
-        target = str(operation.get("to", ""))
-        return (
-            "Rinomina colonna",
-            f"La colonna '{source}' verra rinominata in '{target}'.",
-            [source, target],
-        )
 
-    if op_type == "drop_columns":
-        columns = _as_list(operation.get("columns"))
-        return (
-            "Rimozione colonne",
-            f"Verranno rimosse {len(columns)} colonne dal dataset.",
-            columns,
-        )
+def _describe_drop_columns(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    columns = _as_list(operation.get("columns"))
+    return (
+        "Rimozione colonne",
+        f"Verranno rimosse {len(columns)} colonne dal dataset.",
+        columns,
+    )
 
-    if op_type == "fill_null":
-        column = str(operation.get("column", ""))
-        return (
-            "Sostituzione valori null",
-            f"I valori null in '{column}' verranno sostituiti con un valore di fallback.",
-            [column],
-        )
 
-    if op_type == "cast_type":
-        column = str(operation.get("column", ""))
-        dtype = str(operation.get("dtype", ""))
-        return (
-            "Conversione tipo colonna",
-            f"La colonna '{column}' verra convertita in '{dtype}'.",
-            [column],
-        )
+def _describe_fill_null(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    column = str(operation.get("column", ""))
+    return (
+        "Sostituzione valori null",
+        f"I valori null in '{column}' verranno sostituiti con un valore di fallback.",
+        [column],
+    )
 
-    if op_type == "trim_whitespace":
-        columns = _as_list(operation.get("columns"))
-        return (
-            "Pulizia spazi",
-            "Gli spazi iniziali/finali verranno rimossi nelle colonne indicate.",
-            columns,
-        )
 
-    if op_type == "change_case":
-        columns = _as_list(operation.get("columns"))
-        case = str(operation.get("case", ""))
-        return (
-            "Cambio maiuscole/minuscole",
-            f"Il testo verra convertito in formato '{case}' nelle colonne indicate.",
-            columns,
-        )
+def _describe_cast_type(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    column = str(operation.get("column", ""))
+    dtype = str(operation.get("dtype", ""))
+    return (
+        "Conversione tipo colonna",
+        f"La colonna '{column}' verra convertita in '{dtype}'.",
+        [column],
+    )
 
-    if op_type == "derive_numeric":
-        left = str(operation.get("left_column", ""))
-        right = str(operation.get("right_column", ""))
-        new = str(operation.get("new_column", ""))
-        operator = str(operation.get("operator", ""))
-        return (
-            "Calcolo nuova colonna numerica",
-            f"Sara creata '{new}' usando operazione '{operator}' tra '{left}' e '{right}'.",
-            [left, right, new],
-        )
 
-    if op_type == "filter_rows":
-        column = str(operation.get("column", ""))
-        comparator = str(operation.get("comparator", ""))
-        return (
-            "Filtro righe",
-            f"Le righe verranno filtrate su '{column}' con comparatore '{comparator}'.",
-            [column],
-        )
+def _describe_trim_whitespace(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    columns = _as_list(operation.get("columns"))
+    return (
+        "Pulizia spazi",
+        "Gli spazi iniziali/finali verranno rimossi nelle colonne indicate.",
+        columns,
+    )
 
-    if op_type == "sort_rows":
-        columns = _as_list(operation.get("by"))
-        ascending = bool(operation.get("ascending", True))
-        direction = "crescente" if ascending else "decrescente"
-        return (
-            "Ordinamento righe",
-            f"Le righe verranno ordinate in modo {direction}.",
-            columns,
-        )
 
+def _describe_change_case(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    columns = _as_list(operation.get("columns"))
+    case = str(operation.get("case", ""))
+    return (
+        "Cambio maiuscole/minuscole",
+        f"Il testo verra convertito in formato '{case}' nelle colonne indicate.",
+        columns,
+    )
+
+
+def _describe_derive_numeric(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    left = str(operation.get("left_column", ""))
+    right = str(operation.get("right_column", ""))
+    new = str(operation.get("new_column", ""))
+    operator = str(operation.get("operator", ""))
+    return (
+        "Calcolo nuova colonna numerica",
+        f"Sara creata '{new}' usando operazione '{operator}' tra '{left}' e '{right}'.",
+        [left, right, new],
+    )
+
+
+def _describe_filter_rows(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    column = str(operation.get("column", ""))
+    comparator = str(operation.get("comparator", ""))
+    return (
+        "Filtro righe",
+        f"Le righe verranno filtrate su '{column}' con comparatore '{comparator}'.",
+        [column],
+    )
+
+
+def _describe_sort_rows(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    columns = _as_list(operation.get("by"))
+    ascending = bool(operation.get("ascending", True))
+    direction = "crescente" if ascending else "decrescente"
+    detail = f"Le righe verranno ordinate in modo {direction}."
+    limit = operation.get("limit")
+    if isinstance(limit, int) and not isinstance(limit, bool):
+        detail = f"Le righe verranno ordinate in modo {direction} e verranno mantenute solo le prime {limit}."
+    return (
+        "Ordinamento righe",
+        detail,
+        columns,
+    )
+
+
+def _describe_default(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
     return (
         "Operazione",
         "Trasformazione prevista dal piano.",
@@ -100,14 +111,32 @@ def _describe_step(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
     )
 
 
+_DESCRIBERS: dict[str, Callable[[dict[str, Any]], tuple[str, str, list[str]]]] = {
+    "rename_column": _describe_rename_column,
+    "drop_columns": _describe_drop_columns,
+    "fill_null": _describe_fill_null,
+    "cast_type": _describe_cast_type,
+    "trim_whitespace": _describe_trim_whitespace,
+    "change_case": _describe_change_case,
+    "derive_numeric": _describe_derive_numeric,
+    "filter_rows": _describe_filter_rows,
+    "sort_rows": _describe_sort_rows,
+}
+
+
+def _describe_step(operation: dict[str, Any]) -> tuple[str, str, list[str]]:
+    op_type = operation.get("type")
+    describer = _DESCRIBERS.get(op_type, _describe_default) if isinstance(op_type, str) else _describe_default
+    return describer(operation)
+
+
 def explain_plan(plan: dict[str, Any]) -> tuple[str, list[dict[str, Any]], list[str]]:
     operations = plan.get("operations")
     if not isinstance(operations, list) or not operations:
         return "Nessuna modifica prevista: il piano non contiene step.", [], []
 
     steps: list[dict[str, Any]] = []
-    impacted_columns: list[str] = []
-    seen = set()
+    all_columns: list[str] = []
 
     for operation in operations:
         if not isinstance(operation, dict):
@@ -121,11 +150,9 @@ def explain_plan(plan: dict[str, Any]) -> tuple[str, list[dict[str, Any]], list[
                 "columns": valid_columns,
             }
         )
-        for column in valid_columns:
-            if column not in seen:
-                seen.add(column)
-                impacted_columns.append(column)
+        all_columns.extend(valid_columns)
 
+    impacted_columns = list(dict.fromkeys(all_columns))
     summary = (
         f"Il piano applichera {len(steps)} step e coinvolgera {len(impacted_columns)} colonne."
         if steps
@@ -1,20 +1,79 @@
 from __future__ import annotations
 
-from typing import Any
+import json
+import operator
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import groupby
+from typing import Any, Callable, Iterable
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 
-SUPPORTED_OPERATIONS = {
-    "rename_column",
-    "drop_columns",
-    "fill_null",
-    "cast_type",
-    "trim_whitespace",
-    "change_case",
-    "derive_numeric",
-    "filter_rows",
-    "sort_rows",
+# Fields read by apply_plan for each operation type, besides "type" itself.
+OPERATION_FIELDS: dict[str, tuple[str, ...]] = {
+    "rename_column": ("from", "to"),
+    "drop_columns": ("columns",),
+    "fill_null": ("column", "value"),
+    "cast_type": ("column", "dtype"),
+    "trim_whitespace": ("columns",),
+    "change_case": ("columns", "case"),
+    "derive_numeric": ("left_column", "right_column", "new_column", "operator", "round"),
+    "filter_rows": ("column", "comparator", "value"),
+    "sort_rows": ("by", "ascending", "limit"),
+}
+
+SUPPORTED_OPERATIONS: frozenset[str] = frozenset(OPERATION_FIELDS)
+
+COMPILED_PLAN_CACHE_SIZE = 256
+PARALLEL_COLUMN_MIN_ROWS = 100_000
+COLUMN_MAX_WORKERS = 8
+
+
+_COMPARATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+_NUMERIC_COMPARATORS: frozenset[str] = frozenset({"gt", "gte", "lt", "lte"})
+_EQUALITY_COMPARATORS: frozenset[str] = frozenset({"eq", "neq"})
+_NUMPY_OPERATORS: dict[str, np.ufunc] = {"add": np.add, "sub": np.subtract, "mul": np.multiply}
+_CAST_DTYPES: frozenset[str] = frozenset({"string", "int64", "float64", "datetime", "bool"})
+
+# Internal operation types grouping consecutive steps of one family; never accepted from a plan.
+_FILTER_BATCH = "_filter_batch"
+_DERIVE_BATCH = "_derive_batch"
+_COLUMN_BATCH = "_column_batch"
+_BATCHABLE_OPERATIONS: dict[str, tuple[str, str]] = {
+    "filter_rows": (_FILTER_BATCH, "filters"),
+    "derive_numeric": (_DERIVE_BATCH, "derivations"),
+    # Each of these reads and rewrites only its own columns, so a run of them can go column by column.
+    "fill_null": (_COLUMN_BATCH, "column_operations"),
+    "cast_type": (_COLUMN_BATCH, "column_operations"),
+    "trim_whitespace": (_COLUMN_BATCH, "column_operations"),
+    "change_case": (_COLUMN_BATCH, "column_operations"),
+}
+
+_ARROW_STR_KERNELS: dict[str, Callable[[pa.Array], pa.Array]] = {
+    "strip": pc.utf8_trim_whitespace,
+    "upper": pc.ascii_upper,
+    "lower": pc.ascii_lower,
+    "title": pc.ascii_title,
+}
+
+_Step = Callable[[pd.DataFrame], pd.DataFrame]
+_ColumnTransform = Callable[[pd.Series], pd.Series]
+
+_BOOL_TEXT_VALUES: dict[str, bool] = {
+    **dict.fromkeys(("true", "1", "yes", "y", "t"), True),
+    **dict.fromkeys(("false", "0", "no", "n", "f"), False),
 }
 
 
@@ -22,28 +81,209 @@ class TransformationError(ValueError):
     pass
 
 
-def _require_columns(df: pd.DataFrame, columns: list[str]) -> None:
-    missing = [column for column in columns if column not in df.columns]
+def _require_columns(available: set[Any], columns: list[str]) -> None:
+    missing = [column for column in columns if column not in available]
     if missing:
         raise TransformationError(f"Missing columns: {', '.join(missing)}")
 
 
-def _validate_plan(plan: dict[str, Any]) -> list[dict[str, Any]]:
+# Validators check one operation's fields against the columns it will see and update that set in place.
+def _validate_rename(operation: dict[str, Any], available: set[Any]) -> None:
+    source = operation.get("from")
+    target = operation.get("to")
+    if not source or not target:
+        raise TransformationError("rename_column requires 'from' and 'to'.")
+    _require_columns(available, [source])
+    available.discard(source)
+    available.add(target)
+
+
+def _validate_drop(operation: dict[str, Any], available: set[Any]) -> None:
+    drop = operation.get("columns", [])
+    if not isinstance(drop, list) or not drop:
+        raise TransformationError("drop_columns requires non-empty 'columns'.")
+    _require_columns(available, drop)
+    available.difference_update(drop)
+
+
+def _validate_fill_null(operation: dict[str, Any], available: set[Any]) -> None:
+    column = operation.get("column")
+    if not isinstance(column, str):
+        raise TransformationError("fill_null requires 'column'.")
+    _require_columns(available, [column])
+
+
+def _validate_cast(operation: dict[str, Any], available: set[Any]) -> None:
+    column = operation.get("column")
+    dtype = operation.get("dtype")
+    if not isinstance(column, str) or not isinstance(dtype, str):
+        raise TransformationError("cast_type requires 'column' and 'dtype'.")
+    _require_columns(available, [column])
+    if dtype not in _CAST_DTYPES:
+        raise TransformationError("dtype must be one of: string, int64, float64, datetime, bool")
+
+
+def _validate_trim(operation: dict[str, Any], available: set[Any]) -> None:
+    targets = operation.get("columns", [])
+    if not isinstance(targets, list) or not targets:
+        raise TransformationError("trim_whitespace requires non-empty 'columns'.")
+    _require_columns(available, targets)
+
+
+def _validate_change_case(operation: dict[str, Any], available: set[Any]) -> None:
+    targets = operation.get("columns", [])
+    if not isinstance(targets, list) or not targets:
+        raise TransformationError("change_case requires non-empty 'columns'.")
+    if operation.get("case") not in {"upper", "lower", "title"}:
+        raise TransformationError("change_case.case must be upper, lower, or title.")
+    _require_columns(available, targets)
+
+
+def _validate_derive(operation: dict[str, Any], available: set[Any]) -> None:
+    left_column = operation.get("left_column")
+    right_column = operation.get("right_column")
+    new_column = operation.get("new_column")
+    if not all(isinstance(value, str) for value in [left_column, right_column, new_column]):
+        raise TransformationError("derive_numeric requires 'left_column', 'right_column', and 'new_column'.")
+    if operation.get("operator") not in {"add", "sub", "mul", "div"}:
+        raise TransformationError("derive_numeric.operator must be add, sub, mul, or div.")
+    _require_columns(available, [left_column, right_column])
+    available.add(new_column)
+
+
+def _validate_filter(operation: dict[str, Any], available: set[Any]) -> None:
+    column = operation.get("column")
+    if not isinstance(column, str) or operation.get("comparator") not in _COMPARATORS:
+        raise TransformationError(
+            "filter_rows requires 'column' and comparator in eq, neq, gt, gte, lt, lte."
+        )
+    _require_columns(available, [column])
+
+
+def _validate_sort(operation: dict[str, Any], available: set[Any]) -> None:
+    by = operation.get("by", [])
+    if not isinstance(by, list) or not by:
+        raise TransformationError("sort_rows requires non-empty 'by' list.")
+    if not isinstance(operation.get("ascending", True), bool):
+        raise TransformationError("sort_rows.ascending must be boolean.")
+    limit = operation.get("limit")
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        raise TransformationError("sort_rows.limit must be a positive integer.")
+    _require_columns(available, by)
+
+
+_VALIDATORS: dict[str, Callable[[dict[str, Any], set[Any]], None]] = {
+    "rename_column": _validate_rename,
+    "drop_columns": _validate_drop,
+    "fill_null": _validate_fill_null,
+    "cast_type": _validate_cast,
+    "trim_whitespace": _validate_trim,
+    "change_case": _validate_change_case,
+    "derive_numeric": _validate_derive,
+    "filter_rows": _validate_filter,
+    "sort_rows": _validate_sort,
+}
+
+
+def _validate_plan(plan: dict[str, Any], columns: Iterable[Any]) -> list[dict[str, Any]]:
     operations = plan.get("operations")
     if not isinstance(operations, list):
         raise TransformationError("Plan must contain an 'operations' list.")
+    validators = []
     for operation in operations:
         if not isinstance(operation, dict):
             raise TransformationError("Each operation must be an object.")
         op_type = operation.get("type")
-        if op_type not in SUPPORTED_OPERATIONS:
+        validator = _VALIDATORS.get(op_type) if isinstance(op_type, str) else None
+        if validator is None:
             raise TransformationError(f"Unsupported operation type: {op_type}")
+        validators.append(validator)
+
+    # Checks every step against the columns it will see, so a bad plan fails before any data is touched.
+    available = set(columns)
+    for operation, validator in zip(operations, validators):
+        validator(operation, available)
     return operations
 
 
+def _is_ascii(array: pa.Array | pa.ChunkedArray) -> bool:
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    for chunk in chunks:
+        data = chunk.buffers()[2]
+        if data is not None and data.size and np.frombuffer(data, dtype=np.uint8).max() >= 0x80:
+            return False
+    return True
+
+
+def _arrow_str_methods(series: pd.Series, methods: tuple[str, ...]) -> pd.Series | None:
+    # Only plain-string object columns; case mapping only when ASCII, where Arrow's rules match Python's.
+    if series.dtype != object or pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return None
+    array = pa.array(series, type=pa.string(), from_pandas=True)
+    if any(method != "strip" for method in methods) and not _is_ascii(array):
+        return None
+    for method in methods:
+        array = _ARROW_STR_KERNELS[method](array)
+    result = array.to_pandas()
+    result.index = series.index
+    result.name = series.name
+    return result
+
+
+def _apply_str_method(series: pd.Series, method: str) -> pd.Series:
+    if isinstance(series.dtype, pd.StringDtype):
+        # Cells are strings or NA, so there are no mixed values to restore.
+        if not isinstance(series.array, pd.arrays.ArrowStringArray):
+            return getattr(series.str, method)()
+        array = pa.array(series.array)
+        if method == "strip" or _is_ascii(array):
+            result = _ARROW_STR_KERNELS[method](array)
+            return pd.Series(pd.arrays.ArrowStringArray(result), index=series.index, name=series.name)
+        # Arrow's Unicode case rules differ from Python's (ß, ǆ, final sigma), so non-ASCII text maps in Python.
+        return getattr(series.astype("string[python]").str, method)().astype(series.dtype)
+    result = _arrow_str_methods(series, (method,))
+    if result is not None:
+        return result.where(result.notna(), series)
+    try:
+        accessor = series.str
+    except AttributeError:
+        # Numeric, datetime and bool columns hold no strings to transform.
+        return series
+    result = getattr(accessor, method)()
+    # The accessor yields NaN for non-string cells of mixed columns; keep their original values.
+    return result.where(result.notna(), series)
+
+
+def _apply_str_methods(series: pd.Series, methods: tuple[str, ...]) -> pd.Series:
+    # A run of trim/case steps converts to Arrow and back once instead of once per step.
+    result = _arrow_str_methods(series, methods)
+    if result is not None:
+        return result.where(result.notna(), series)
+    for method in methods:
+        series = _apply_str_method(series, method)
+    return series
+
+
+def _cast_bool(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype("boolean")
+    if pd.api.types.is_numeric_dtype(series):
+        return series.ne(0).astype("boolean").mask(series.isna())
+
+    text = series.astype("string[pyarrow]").str.strip().str.lower()
+    result = text.map(_BOOL_TEXT_VALUES).astype("boolean")
+    unresolved = result.isna() & series.notna()
+    if unresolved.any():
+        # Numbers stored in object columns (e.g. 2 or 1.0) follow Python truthiness.
+        result[unresolved] = series[unresolved].map(
+            lambda value: bool(value) if isinstance(value, (int, float)) else pd.NA
+        )
+    return result
+
+
 def _cast_series(series: pd.Series, dtype: str) -> pd.Series:
     if dtype == "string":
-        return series.astype("string")
+        return series.astype("string[pyarrow]")
     if dtype == "int64":
         return pd.to_numeric(series, errors="coerce").astype("Int64")
     if dtype == "float64":
@@ -51,168 +291,257 @@ def _cast_series(series: pd.Series, dtype: str) -> pd.Series:
     if dtype == "datetime":
         return pd.to_datetime(series, errors="coerce")
     if dtype == "bool":
-        truthy = {"true", "1", "yes", "y", "t"}
-        falsy = {"false", "0", "no", "n", "f"}
-
-        def _to_bool(value: Any) -> Any:
-            if pd.isna(value):
-                return pd.NA
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, (int, float)):
-                return bool(value)
-            text = str(value).strip().lower()
-            if text in truthy:
-                return True
-            if text in falsy:
-                return False
-            return pd.NA
-
-        return series.map(_to_bool).astype("boolean")
+        return _cast_bool(series)
     raise TransformationError("dtype must be one of: string, int64, float64, datetime, bool")
 
 
-def apply_plan(df: pd.DataFrame, plan: dict[str, Any]) -> pd.DataFrame:
-    operations = _validate_plan(plan)
-    transformed = df.copy()
-
+def _batch_consecutive(operations: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    batched: list[dict[str, Any]] = []
     for operation in operations:
-        op_type = operation["type"]
-
-        if op_type == "rename_column":
-            source = operation.get("from")
-            target = operation.get("to")
-            if not source or not target:
-                raise TransformationError("rename_column requires 'from' and 'to'.")
-            _require_columns(transformed, [source])
-            transformed = transformed.rename(columns={source: target})
+        batch_type, key = _BATCHABLE_OPERATIONS.get(operation["type"], (None, None))
+        previous = batched[-1] if batched else None
+        previous_type = previous["type"] if previous else None
+        if batch_type and _BATCHABLE_OPERATIONS.get(previous_type, (previous_type,))[0] == batch_type:
+            if previous["type"] != batch_type:
+                previous = batched[-1] = {"type": batch_type, key: [previous]}
+            previous[key].append(operation)
             continue
+        batched.append(operation)
+    return batched
 
-        if op_type == "drop_columns":
-            columns = operation.get("columns", [])
-            if not isinstance(columns, list) or not columns:
-                raise TransformationError("drop_columns requires non-empty 'columns'.")
-            _require_columns(transformed, columns)
-            transformed = transformed.drop(columns=columns)
-            continue
 
-        if op_type == "fill_null":
-            column = operation.get("column")
-            if not isinstance(column, str):
-                raise TransformationError("fill_null requires 'column'.")
-            _require_columns(transformed, [column])
-            transformed.loc[:, column] = transformed[column].fillna(operation.get("value"))
-            continue
-
-        if op_type == "cast_type":
-            column = operation.get("column")
-            dtype = operation.get("dtype")
-            if not isinstance(column, str) or not isinstance(dtype, str):
-                raise TransformationError("cast_type requires 'column' and 'dtype'.")
-            _require_columns(transformed, [column])
-            transformed.loc[:, column] = _cast_series(transformed[column], dtype)
-            continue
+def _is_plain_numeric(series: pd.Series) -> bool:
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"
 
-        if op_type == "trim_whitespace":
-            columns = operation.get("columns", [])
-            if not isinstance(columns, list) or not columns:
-                raise TransformationError("trim_whitespace requires non-empty 'columns'.")
-            _require_columns(transformed, columns)
-            for column in columns:
-                transformed.loc[:, column] = transformed[column].map(
-                    lambda value: value.strip() if isinstance(value, str) else value
-                )
-            continue
 
-        if op_type == "change_case":
-            columns = operation.get("columns", [])
-            case = operation.get("case")
-            if not isinstance(columns, list) or not columns:
-                raise TransformationError("change_case requires non-empty 'columns'.")
-            if case not in {"upper", "lower", "title"}:
-                raise TransformationError("change_case.case must be upper, lower, or title.")
-            _require_columns(transformed, columns)
-            for column in columns:
-                if case == "upper":
-                    transformed.loc[:, column] = transformed[column].map(
-                        lambda value: value.upper() if isinstance(value, str) else value
-                    )
-                elif case == "lower":
-                    transformed.loc[:, column] = transformed[column].map(
-                        lambda value: value.lower() if isinstance(value, str) else value
-                    )
-                else:
-                    transformed.loc[:, column] = transformed[column].map(
-                        lambda value: value.title() if isinstance(value, str) else value
-                    )
-            continue
+def _derive_numeric(df: pd.DataFrame, derivations: list[dict[str, Any]]) -> None:
+    # Coerced inputs are shared across a run of derivations; derived columns are numeric already.
+    numeric_columns: dict[str, pd.Series] = {}
+    for operation in derivations:
+        left_column = operation["left_column"]
+        right_column = operation["right_column"]
+        new_column = operation["new_column"]
+        operator = operation["operator"]
+        round_digits = operation.get("round")
 
-        if op_type == "derive_numeric":
-            left_column = operation.get("left_column")
-            right_column = operation.get("right_column")
-            new_column = operation.get("new_column")
-            operator = operation.get("operator")
-            round_digits = operation.get("round")
-
-            if not all(isinstance(value, str) for value in [left_column, right_column, new_column]):
-                raise TransformationError(
-                    "derive_numeric requires 'left_column', 'right_column', and 'new_column'."
-                )
-            if operator not in {"add", "sub", "mul", "div"}:
-                raise TransformationError("derive_numeric.operator must be add, sub, mul, or div.")
-            _require_columns(transformed, [left_column, right_column])
-
-            left_values = pd.to_numeric(transformed[left_column], errors="coerce")
-            right_values = pd.to_numeric(transformed[right_column], errors="coerce")
-            if operator == "add":
-                output = left_values + right_values
-            elif operator == "sub":
-                output = left_values - right_values
-            elif operator == "mul":
-                output = left_values * right_values
+        for column in (left_column, right_column):
+            if column not in numeric_columns:
+                numeric_columns[column] = pd.to_numeric(df[column], errors="coerce")
+        left_values = numeric_columns[left_column]
+        right_values = numeric_columns[right_column]
+        if operator != "div":
+            ufunc = _NUMPY_OPERATORS[operator]
+            if _is_plain_numeric(left_values) and _is_plain_numeric(right_values):
+                # Both sides come from the same frame, so the arrays are already aligned.
+                output = ufunc(left_values.to_numpy(), right_values.to_numpy())
             else:
-                output = left_values / right_values.replace(0, pd.NA)
+                # Nullable extension dtypes keep pandas' masked arithmetic.
+                output = ufunc(left_values, right_values)
+        else:
+            left_array = left_values.to_numpy(dtype="float64", na_value=np.nan)
+            right_array = right_values.to_numpy(dtype="float64", na_value=np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                output = np.divide(left_array, right_array)
+            output[right_array == 0] = np.nan
 
-            if isinstance(round_digits, int):
-                output = output.round(round_digits)
-            transformed.loc[:, new_column] = output
-            continue
+        if isinstance(round_digits, int):
+            output = output.round(round_digits)
+        df[new_column] = output
+        numeric_columns[new_column] = df[new_column]
+
+
+def _filter_rows(df: pd.DataFrame, filters: list[dict[str, Any]]) -> pd.DataFrame:
+    # Filters only drop rows, so a run of them can be evaluated against the same frame and applied once.
+    numeric_columns: dict[str, pd.Series] = {}
+    # Text columns matched by several eq/neq filters are factorized once; each match then compares int codes.
+    equality_counts = Counter(
+        operation["column"]
+        for operation in filters
+        if operation["comparator"] in _EQUALITY_COMPARATORS and isinstance(operation.get("value"), str)
+    )
+    factorized_columns: dict[str, tuple[np.ndarray, pd.Index]] = {}
+    mask = None
+    for operation in filters:
+        column = operation["column"]
+        comparator = operation["comparator"]
+        value = operation.get("value")
+        if comparator in _NUMERIC_COMPARATORS:
+            if column not in numeric_columns:
+                numeric_columns[column] = pd.to_numeric(df[column], errors="coerce")
+            condition = _COMPARATORS[comparator](numeric_columns[column], value)
+        elif equality_counts[column] > 1 and isinstance(value, str) and df[column].dtype == object:
+            if column not in factorized_columns:
+                factorized_columns[column] = pd.factorize(df[column])
+            codes, uniques = factorized_columns[column]
+            code = uniques.get_loc(value) if value in uniques else -2
+            condition = _COMPARATORS[comparator](codes, code)
+        else:
+            condition = _COMPARATORS[comparator](df[column], value)
+        mask = condition if mask is None else mask & condition
+    return df[mask]
+
+
+# Step builders turn one validated (possibly batched) operation into a callable over the working frame.
+# The frame passed to a step is always owned by apply_plan, so steps may modify it in place.
+def _rename_step(operation: dict[str, Any]) -> _Step:
+    mapping = {operation["from"]: operation["to"]}
+    return lambda df: df.rename(columns=mapping, copy=False)
+
+
+def _drop_step(operation: dict[str, Any]) -> _Step:
+    columns = list(dict.fromkeys(operation["columns"]))
 
-        if op_type == "filter_rows":
-            column = operation.get("column")
-            comparator = operation.get("comparator")
-            value = operation.get("value")
-            if not isinstance(column, str) or comparator not in {"eq", "neq", "gt", "gte", "lt", "lte"}:
-                raise TransformationError(
-                    "filter_rows requires 'column' and comparator in eq, neq, gt, gte, lt, lte."
-                )
-            _require_columns(transformed, [column])
-
-            series = transformed[column]
-            if comparator == "eq":
-                transformed = transformed[series == value]
-            elif comparator == "neq":
-                transformed = transformed[series != value]
-            elif comparator == "gt":
-                transformed = transformed[pd.to_numeric(series, errors="coerce") > value]
-            elif comparator == "gte":
-                transformed = transformed[pd.to_numeric(series, errors="coerce") >= value]
-            elif comparator == "lt":
-                transformed = transformed[pd.to_numeric(series, errors="coerce") < value]
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        # Deleting from the owned frame reuses the remaining column arrays; drop() would copy them all.
+        for column in columns:
+            del df[column]
+        return df
+
+    return step
+
+
+def _column_chain(operation: dict[str, Any]) -> tuple[list[str], _ColumnTransform | str]:
+    # String methods are returned by name so consecutive ones can be fused by _column_step.
+    op_type = operation["type"]
+    if op_type == "fill_null":
+        value = operation.get("value")
+        return [operation["column"]], lambda series: series.fillna(value)
+    if op_type == "cast_type":
+        dtype = operation["dtype"]
+        return [operation["column"]], lambda series: _cast_series(series, dtype)
+    method = "strip" if op_type == "trim_whitespace" else operation["case"]
+    return list(operation["columns"]), method
+
+
+def _run_pipeline(series: pd.Series, transforms: list[_ColumnTransform]) -> pd.Series:
+    for transform in transforms:
+        series = transform(series)
+    return series
+
+
+def _column_step(operations: list[dict[str, Any]]) -> _Step:
+    # Each column is read once, run through its own sequence of operations and written back once.
+    chains: dict[str, list[_ColumnTransform | str]] = {}
+    for operation in operations:
+        columns, transform = _column_chain(operation)
+        for column in columns:
+            chains.setdefault(column, []).append(transform)
+
+    pipelines: dict[str, list[_ColumnTransform]] = {}
+    for column, chain in chains.items():
+        pipeline = pipelines[column] = []
+        for is_method, group in groupby(chain, key=lambda transform: isinstance(transform, str)):
+            if is_method:
+                pipeline.append(partial(_apply_str_methods, methods=tuple(group)))
             else:
-                transformed = transformed[pd.to_numeric(series, errors="coerce") <= value]
-            transformed = transformed.reset_index(drop=True)
-            continue
+                pipeline.extend(group)
 
-        if op_type == "sort_rows":
-            by = operation.get("by", [])
-            ascending = operation.get("ascending", True)
-            if not isinstance(by, list) or not by:
-                raise TransformationError("sort_rows requires non-empty 'by' list.")
-            if not isinstance(ascending, bool):
-                raise TransformationError("sort_rows.ascending must be boolean.")
-            _require_columns(transformed, by)
-            transformed = transformed.sort_values(by=by, ascending=ascending).reset_index(drop=True)
-            continue
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        # Frame reads and writes stay on this thread; only the per-column pipelines run on workers.
+        inputs = [df[column] for column in pipelines]
+        if len(pipelines) >= 2 and len(df) >= PARALLEL_COLUMN_MIN_ROWS:
+            # Arrow and NumPy kernels release the GIL, so independent columns overlap on large frames.
+            with ThreadPoolExecutor(max_workers=min(COLUMN_MAX_WORKERS, len(pipelines))) as executor:
+                outputs = list(executor.map(_run_pipeline, inputs, pipelines.values()))
+        else:
+            outputs = list(map(_run_pipeline, inputs, pipelines.values()))
+        for column, series in zip(pipelines, outputs):
+            df[column] = series
+        return df
+
+    return step
+
+
+def _derive_step(derivations: list[dict[str, Any]]) -> _Step:
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        _derive_numeric(df, derivations)
+        return df
+
+    return step
+
+
+def _filter_step(filters: list[dict[str, Any]]) -> _Step:
+    return lambda df: _filter_rows(df, filters)
+
+
+def _top_rows(df: pd.DataFrame, column: str, ascending: bool, limit: int) -> pd.DataFrame | None:
+    values = df[column].to_numpy()
+    if limit >= len(values) or values.dtype.kind not in "iuf":
+        return None
+    if values.dtype.kind == "f":
+        # NaN partitions as the largest key either way, so it stays last like na_position="last".
+        keys = values if ascending else -values
+    else:
+        # Bitwise not reverses integer order without the overflow of negation.
+        keys = values if ascending else ~values
+    kth = np.partition(keys, limit - 1)[limit - 1]
+    # Every row tied with the cut-off key stays a candidate, so ties keep row order like a stable sort.
+    # A NaN cut-off means fewer than limit numbers, so all rows compete.
+    candidates = np.arange(len(keys)) if kth != kth else np.flatnonzero(keys <= kth)
+    return df.take(candidates[np.argsort(keys[candidates], kind="stable")][:limit])
+
+
+def _sort_step(operation: dict[str, Any]) -> _Step:
+    by = list(operation["by"])
+    ascending = operation.get("ascending", True)
+    limit = operation.get("limit")
+
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        if limit is None:
+            return df.sort_values(by=by, ascending=ascending)
+        # A top-N on one numeric key only needs a partial partition of the column, not a full sort.
+        top = _top_rows(df, by[0], ascending, limit) if len(by) == 1 else None
+        return top if top is not None else df.sort_values(by=by, ascending=ascending, kind="stable").head(limit)
+
+    return step
+
+
+_STEP_BUILDERS: dict[str, Callable[[dict[str, Any]], _Step]] = {
+    "rename_column": _rename_step,
+    "drop_columns": _drop_step,
+    "fill_null": lambda operation: _column_step([operation]),
+    "cast_type": lambda operation: _column_step([operation]),
+    "trim_whitespace": lambda operation: _column_step([operation]),
+    "change_case": lambda operation: _column_step([operation]),
+    _COLUMN_BATCH: lambda operation: _column_step(operation["column_operations"]),
+    "derive_numeric": lambda operation: _derive_step([operation]),
+    _DERIVE_BATCH: lambda operation: _derive_step(operation["derivations"]),
+    "filter_rows": lambda operation: _filter_step([operation]),
+    _FILTER_BATCH: lambda operation: _filter_step(operation["filters"]),
+    "sort_rows": _sort_step,
+}
+
+
+def _compile_plan(plan: dict[str, Any], columns: Iterable[Any]) -> list[_Step]:
+    operations = _batch_consecutive(_validate_plan(plan, columns))
+    return [_STEP_BUILDERS[operation["type"]](operation) for operation in operations]
+
+
+@lru_cache(maxsize=COMPILED_PLAN_CACHE_SIZE)
+def _compile_plan_cached(plan_json: str, columns: tuple[Any, ...]) -> tuple[_Step, ...]:
+    # Compiled from the parsed key, so the cached steps never share dicts with a caller's plan.
+    return tuple(_compile_plan(json.loads(plan_json), columns))
+
+
+def _plan_steps(plan: dict[str, Any], columns: pd.Index) -> Iterable[_Step]:
+    # Re-previewed and re-applied plans reuse their validated steps while the columns are unchanged.
+    try:
+        plan_json = json.dumps(plan, sort_keys=True)
+        column_key = tuple(columns)
+        hash(column_key)
+    except (TypeError, ValueError):
+        return _compile_plan(plan, columns)
+    return _compile_plan_cached(plan_json, column_key)
+
+
+def apply_plan(df: pd.DataFrame, plan: dict[str, Any]) -> pd.DataFrame:
+    steps = _plan_steps(plan, df.columns)
+    # Shallow copy: steps replace whole columns, so the caller's (possibly cached) arrays are never written.
+    # Untouched columns of the result still share those arrays; callers must not mutate it in place.
+    transformed = df.copy(deep=False)
+    for step in steps:
+        transformed = step(transformed)
 
+    # Filters and sorts keep the source labels; renumber once, without the copy reset_index makes.
+    transformed.index = pd.RangeIndex(len(transformed))
     return transformed
@@ -2,34 +2,69 @@ from __future__ import annotations
 
 import sqlite3
 import threading
-from datetime import datetime, timezone
 from pathlib import Path
 
+from app.config import ensure_dir
 
-def _utcnow_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+_BULK_QUERY_CHUNK_SIZE = 500
+_SELECT_USAGE_SQL = "SELECT usage_count FROM usage WHERE user_id = ?"
+# Atomic check-and-increment: the conflict branch only fires below the limit, otherwise no row is returned.
+_CONSUME_SQL = """
+    INSERT INTO usage (user_id, usage_count, updated_at)
+    VALUES (?, 1, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    ON CONFLICT(user_id) DO UPDATE
+        SET usage_count = usage_count + 1, updated_at = excluded.updated_at
+        WHERE usage_count < ?
+    RETURNING usage_count
+"""
 
 
 class UsageLimiter:
     def __init__(self, db_path: Path, max_uses: int) -> None:
         self.db_path = db_path
         self.max_uses = max_uses
-        self._lock = threading.Lock()
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        ensure_dir(self.db_path.parent)
         self._init_db()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as connection:
-            connection.execute(
-                """
-                CREATE TABLE IF NOT EXISTS usage (
-                    user_id TEXT PRIMARY KEY,
-                    usage_count INTEGER NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-                """
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                user_id TEXT PRIMARY KEY,
+                usage_count INTEGER NOT NULL,
+                updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
             )
-            connection.commit()
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # One autocommit connection per worker thread; close() may run from another thread.
+            connection = sqlite3.connect(
+                self.db_path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
 
     @staticmethod
     def _clean_user_id(user_id: str) -> str:
@@ -37,43 +72,44 @@ class UsageLimiter:
 
     def get_usage(self, user_id: str) -> int:
         clean = self._clean_user_id(user_id)
-        with sqlite3.connect(self.db_path) as connection:
-            row = connection.execute(
-                "SELECT usage_count FROM usage WHERE user_id = ?",
-                (clean,),
-            ).fetchone()
+        row = self._connection().execute(_SELECT_USAGE_SQL, (clean,)).fetchone()
         return int(row[0]) if row else 0
 
+    def get_usage_bulk(self, user_ids: list[str]) -> dict[str, int]:
+        clean_ids = {user_id: self._clean_user_id(user_id) for user_id in user_ids}
+        unique_ids = list(dict.fromkeys(clean_ids.values()))
+        connection = self._connection()
+        counts: dict[str, int] = {}
+        for start in range(0, len(unique_ids), _BULK_QUERY_CHUNK_SIZE):
+            chunk = unique_ids[start : start + _BULK_QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            counts.update(
+                connection.execute(
+                    f"SELECT user_id, usage_count FROM usage WHERE user_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            )
+        return {user_id: int(counts.get(clean, 0)) for user_id, clean in clean_ids.items()}
+
+    def remaining_for(self, usage_count: int) -> int:
+        return max(0, self.max_uses - usage_count)
+
     def get_remaining(self, user_id: str) -> int:
-        return max(0, self.max_uses - self.get_usage(user_id))
+        return self.remaining_for(self.get_usage(user_id))
 
     def can_consume(self, user_id: str) -> bool:
         return self.get_usage(user_id) < self.max_uses
 
     def consume(self, user_id: str) -> tuple[int, int]:
+        if self.max_uses <= 0:
+            return self.get_usage(user_id), 0
+
         clean = self._clean_user_id(user_id)
-        with self._lock:
-            with sqlite3.connect(self.db_path) as connection:
-                connection.execute("BEGIN IMMEDIATE")
-                row = connection.execute(
-                    "SELECT usage_count FROM usage WHERE user_id = ?",
-                    (clean,),
-                ).fetchone()
-                usage_count = int(row[0]) if row else 0
-                if usage_count >= self.max_uses:
-                    connection.rollback()
-                    return usage_count, 0
-
-                new_usage = usage_count + 1
-                if row:
-                    connection.execute(
-                        "UPDATE usage SET usage_count = ?, updated_at = ? WHERE user_id = ?",
-                        (new_usage, _utcnow_iso(), clean),
-                    )
-                else:
-                    connection.execute(
-                        "INSERT INTO usage (user_id, usage_count, updated_at) VALUES (?, ?, ?)",
-                        (clean, new_usage, _utcnow_iso()),
-                    )
-                connection.commit()
-                return new_usage, max(0, self.max_uses - new_usage)
+        connection = self._connection()
+        row = connection.execute(_CONSUME_SQL, (clean, self.max_uses)).fetchone()
+        if row is None:
+            usage_row = connection.execute(_SELECT_USAGE_SQL, (clean,)).fetchone()
+            return (int(usage_row[0]) if usage_row else 0), 0
+
+        new_usage = int(row[0])
+        return new_usage, self.remaining_for(new_usage)
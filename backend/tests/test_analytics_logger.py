@@ -0,0 +1,31 @@
+import sqlite3
+from pathlib import Path
+
+from app.services.analytics_logger import AnalyticsLogger
+
+
+def _log(logger: AnalyticsLogger) -> None:
+    logger.log_transform_event(
+        user_id="tester",
+        plan={"operations": [{"type": "sort_rows", "by": ["amount"]}]},
+        file_size_bytes=10,
+        processing_ms=1,
+        status="success",
+        error_code=None,
+        plan_tier="free",
+        output_format="csv",
+    )
+
+
+def test_analytics_logger_drops_events_after_close(tmp_path: Path) -> None:
+    logger = AnalyticsLogger(tmp_path / "usage.db")
+    _log(logger)
+    logger.flush()
+    logger.close()
+
+    _log(logger)
+    logger.flush()
+    logger.close()
+
+    with sqlite3.connect(tmp_path / "usage.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM analytics_events").fetchone() == (1,)
@@ -91,6 +91,7 @@ def test_upload_plan_transform_flow(tmp_path: Path) -> None:
     )
     assert failed_apply_response.status_code == 400
 
+    app.state.services.analytics_logger.flush()
     with sqlite3.connect(settings.usage_db_path) as connection:
         rows = connection.execute(
             """
@@ -200,6 +201,7 @@ def test_apply_rejects_empty_or_missing_operations(tmp_path: Path) -> None:
     bad_plans = [
         {},
         {"operations": []},
+        {"operations": "sort_rows"},
     ]
     for bad_plan in bad_plans:
         apply_response = client.post(
@@ -217,6 +219,19 @@ def test_apply_rejects_empty_or_missing_operations(tmp_path: Path) -> None:
             == "Il piano non contiene operazioni. Genera o modifica il piano prima di applicarlo."
         )
 
+    malformed_response = client.post(
+        "/api/transform",
+        json={"file_id": file_id, "user_id": "tester", "output_format": "csv", "plan": {"operations": [1]}},
+    )
+    assert malformed_response.status_code == 400
+    malformed_preview = client.post("/api/transform/preview", json={"file_id": file_id, "plan": {"operations": [1]}})
+    assert malformed_preview.status_code == 400
+
+    client.app.state.services.analytics_logger.flush()
+    with sqlite3.connect(settings.usage_db_path) as connection:
+        error_codes = [row[0] for row in connection.execute("SELECT error_code FROM analytics_events ORDER BY id")]
+    assert error_codes == ["invalid_plan"] * 4
+
     usage_response = client.get("/api/usage/tester")
     assert usage_response.status_code == 200
     assert usage_response.json()["usage_count"] == 0
@@ -275,23 +290,23 @@ def test_plan_returns_clarify_when_llm_returns_empty_plan(tmp_path: Path) -> Non
     )
     app = create_app(settings)
 
-    class _FakeCompletions:
+    class _FakeRawCompletions:
         def create(self, **kwargs):
-            class _Message:
-                content = '{"type":"plan","plan":{"operations":[]}}'
-
-            class _Choice:
-                message = _Message()
-
             class _Response:
-                choices = [_Choice()]
+                content = b'{"choices":[{"message":{"content":"{\\"type\\":\\"plan\\",\\"plan\\":{\\"operations\\":[]}}"}}]}'
 
             return _Response()
 
     app.state.services.llm_planner._client = type(
         "FakeClient",
         (),
-        {"chat": type("FakeChat", (), {"completions": _FakeCompletions()})()},
+        {
+            "chat": type(
+                "FakeChat",
+                (),
+                {"completions": type("FakeCompletions", (), {"with_raw_response": _FakeRawCompletions()})()},
+            )()
+        },
     )()
 
     client = TestClient(app)
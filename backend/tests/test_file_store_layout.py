@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 import pandas as pd
 from openpyxl import load_workbook
 
@@ -45,3 +47,33 @@ def test_save_result_skips_layout_pack_when_disabled(tmp_path, monkeypatch) -> N
 
     assert worksheet.freeze_panes is None
     assert len(worksheet.tables) == 0
+
+
+def test_save_result_csv_matches_pandas_bytes(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    frames = [
+        pd.DataFrame({"id": [1, 2, 3], "nome": ["Anna", None, "Mario Rossi"]}),
+        pd.DataFrame({"nome": ['Rossi, "Anna"', "Mario"], "importo": [1.0, 2.5]}),
+    ]
+    expected = [
+        b"id,nome\n1,Anna\n2,\n3,Mario Rossi\n",
+        b'nome,importo\n"Rossi, ""Anna""",1.0\nMario,2.5\n',
+    ]
+
+    for frame, expected_bytes in zip(frames, expected):
+        metadata = store.save_result(frame, source_file_id="source-3", output_format="csv")
+        assert Path(metadata["stored_path"]).read_bytes() == expected_bytes
+
+
+def test_save_result_writes_duplicate_headers_without_table(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    source = pd.DataFrame([["Anna", "Rossi", 30], ["Mario", "Bianchi", 40]], columns=["nome", "nome", "eta"])
+
+    metadata = store.save_result(source, source_file_id="source-4", output_format="xlsx")
+    worksheet = load_workbook(metadata["stored_path"]).active
+
+    assert [cell.value for cell in worksheet[1]] == ["nome", "nome", "eta"]
+    assert [cell.value for cell in worksheet[2]] == ["Anna", "Rossi", 30]
+    assert len(worksheet.tables) == 0
+    assert worksheet.auto_filter.ref == "A1:C3"
+    assert worksheet.freeze_panes == "A2"
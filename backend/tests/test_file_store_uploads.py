@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.file_store import FileStore
+from app.services.transformer import apply_plan
+
+
+def test_save_upload_writes_parquet_sidecar_and_reuses_parsed_frame(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    upload = UploadFile(file=io.BytesIO(b"name,amount\nanna,10\nmario,20\n"), filename="sample.csv")
+
+    metadata = store.save_upload(upload)
+
+    assert Path(metadata["stored_path"]).with_suffix(".parquet").exists()
+    first = store.load_upload_df(metadata["file_id"])
+    second = store.load_upload_df(metadata["file_id"])
+    assert first is second
+    assert first.to_dict(orient="list") == {"name": ["anna", "mario"], "amount": [10, 20]}
+
+
+def test_csv_date_columns_stay_text_and_filter_by_string(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    csv_data = b"name,day,at\nanna,2024-01-05,2024-01-05 10:00\nmario,2024-02-01,2024-02-01 11:30\n"
+    metadata = store.save_upload(UploadFile(file=io.BytesIO(csv_data), filename="dates.csv"))
+
+    df = store.load_upload_df(metadata["file_id"])
+    assert df["day"].tolist() == ["2024-01-05", "2024-02-01"]
+    assert df["at"].tolist() == ["2024-01-05 10:00", "2024-02-01 11:30"]
+
+    plan = {"operations": [{"type": "filter_rows", "column": "day", "comparator": "eq", "value": "2024-01-05"}]}
+    transformed = apply_plan(df, plan)
+    assert transformed["name"].tolist() == ["anna"]
+
+
+def test_csv_duplicate_and_blank_headers_are_renamed(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    metadata = store.save_upload(UploadFile(file=io.BytesIO(b"a,a,b,\n1,2,3,4\n"), filename="headers.csv"))
+
+    df = store.load_upload_df(metadata["file_id"])
+    assert list(df.columns) == ["a", "a.1", "b", "Unnamed: 3"]
+
+
+def test_upload_analysis_is_cached_per_stored_file(tmp_path) -> None:
+    store = FileStore(tmp_path / "data")
+    metadata = store.save_upload(UploadFile(file=io.BytesIO(b"name\nanna\n"), filename="sample.csv"))
+    file_id = metadata["file_id"]
+    builds: list[int] = []
+
+    def build(df) -> int:
+        builds.append(len(df))
+        return len(builds)
+
+    assert store.upload_analysis(file_id, 10, build) == 1
+    assert store.upload_analysis(file_id, 10, build) == 1
+    assert store.upload_analysis(file_id, 20, build) == 2
+
+    stat = os.stat(metadata["stored_path"])
+    os.utime(metadata["stored_path"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.upload_analysis(file_id, 10, build) == 3
+
+    os.remove(metadata["stored_path"])
+    with pytest.raises(FileNotFoundError):
+        store.upload_analysis(file_id, 10, build)
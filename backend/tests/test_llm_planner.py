@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.services.llm_planner import LLMPlanner, PlanCache
+
+PLAN_CONTENT = '{"type":"plan","plan":{"operations":[{"type":"sort_rows","by":["amount"]}]}}'
+
+
+def _completion_handler(calls: list[dict]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body)
+        if "rompi" in body["messages"][-1]["content"]:
+            raise httpx.ConnectError("boom", request=request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": PLAN_CONTENT}}]})
+
+    return handler
+
+
+def _sync_client(handler) -> OpenAI:
+    return OpenAI(
+        api_key="sk-test",
+        base_url="https://llm.test/v1",
+        max_retries=0,
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+
+
+def _planner(
+    calls: list[dict],
+    plan_cache: PlanCache | None = None,
+    async_clients: list[AsyncOpenAI] | None = None,
+) -> LLMPlanner:
+    async_clients = [] if async_clients is None else async_clients
+    planner = LLMPlanner(
+        "openai",
+        openai_api_key="sk-test",
+        openai_model="gpt-4.1-mini",
+        openai_base_url=None,
+        kimi_api_key=None,
+        kimi_model="moonshot-v1-8k",
+        kimi_base_url="https://api.moonshot.cn/v1",
+        plan_cache=plan_cache,
+    )
+    transport_handler = _completion_handler(calls)
+    planner._client = _sync_client(transport_handler)
+
+    def new_async_client() -> AsyncOpenAI:
+        client = AsyncOpenAI(
+            api_key="sk-test",
+            base_url="https://llm.test/v1",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(transport_handler)),
+        )
+        async_clients.append(client)
+        return client
+
+    planner._new_async_client = new_async_client
+    return planner
+
+
+def test_plan_cache_reuses_plan_for_same_prompt_and_analysis() -> None:
+    calls: list[dict] = []
+    planner = _planner(calls, PlanCache(max_entries=8, ttl_seconds=60))
+    analysis = {"columns": [{"name": "amount", "dtype": "int64"}], "row_count": 2}
+
+    first = planner.create_plan("Ordina per amount", analysis)
+    second = planner.create_plan("  Ordina per amount ", analysis)
+    third = planner.create_plan("Ordina per amount", {**analysis, "row_count": 3})
+    fourth = planner.create_plan("Ordina per AMOUNT", analysis)
+
+    assert first == second == third == fourth
+    assert first["type"] == "plan"
+    assert len(calls) == 3
+
+
+def test_create_plan_many_maps_failures_to_clarify() -> None:
+    calls: list[dict] = []
+    planner = _planner(calls)
+    analysis = {"columns": [{"name": "amount", "dtype": "int64"}], "row_count": 2}
+
+    results = asyncio.run(
+        planner.create_plan_many(
+            [("Ordina per amount", analysis), ("rompi tutto", analysis), ("Ordina per amount", analysis)],
+            concurrency=2,
+        )
+    )
+
+    assert [result["type"] for result in results] == ["plan", "clarify", "plan"]
+    assert len(calls) == 3
+
+
+def test_create_plan_many_uses_a_fresh_client_per_event_loop() -> None:
+    calls: list[dict] = []
+    async_clients: list[AsyncOpenAI] = []
+    planner = _planner(calls, async_clients=async_clients)
+    analysis = {"columns": [{"name": "amount", "dtype": "int64"}], "row_count": 2}
+
+    for _ in range(2):
+        results = asyncio.run(planner.create_plan_many([("Ordina per amount", analysis)]))
+        assert [result["type"] for result in results] == ["plan"]
+
+    assert len(async_clients) == 2
+    assert all(client.is_closed() for client in async_clients)
+
+
+BATCH_INPUT_FILE = {
+    "id": "file-in",
+    "object": "file",
+    "bytes": 1,
+    "created_at": 0,
+    "filename": "plans.jsonl",
+    "purpose": "batch",
+    "status": "processed",
+}
+BATCH_OBJECT = {
+    "id": "batch-1",
+    "object": "batch",
+    "endpoint": "/v1/chat/completions",
+    "input_file_id": "file-in",
+    "completion_window": "24h",
+    "created_at": 0,
+    "request_counts": {"completed": 2, "failed": 1, "total": 4},
+}
+
+
+def _batch_handler(state: dict):
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/files":
+            state["uploaded"] = request.content
+            return httpx.Response(200, json=BATCH_INPUT_FILE)
+        if path.startswith("/v1/batches"):
+            return httpx.Response(
+                200,
+                json={**BATCH_OBJECT, "status": state["status"], "output_file_id": state.get("output_file_id")},
+            )
+        if path == "/v1/files/file-out/content":
+            return httpx.Response(200, content=state["output"].encode())
+        return httpx.Response(404, json={"error": {"message": path}})
+
+    return handler
+
+
+def _batch_line(custom_id: object, status_code: int = 200, content: str = PLAN_CONTENT) -> str:
+    body = {"choices": [{"message": {"content": content}}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status_code, "body": body}})
+
+
+def test_submit_batch_uploads_one_request_per_item() -> None:
+    state = {"status": "validating"}
+    planner = _planner([])
+    planner._client = _sync_client(_batch_handler(state))
+    analysis = {"columns": [{"name": "amount", "dtype": "int64"}], "row_count": 2}
+
+    batch_id = planner.submit_batch([("Ordina per amount", analysis), ("Filtra amount", analysis)])
+
+    assert batch_id == "batch-1"
+    assert b'"custom_id":"plan-0"' in state["uploaded"]
+    assert b'"custom_id":"plan-1"' in state["uploaded"]
+    assert planner.fetch_batch(batch_id) is None
+
+
+def test_fetch_batch_skips_failed_and_malformed_records() -> None:
+    state = {
+        "status": "completed",
+        "output_file_id": "file-out",
+        "output": "\n".join(
+            [
+                _batch_line("plan-2"),
+                _batch_line("plan-0", status_code=500),
+                _batch_line("unexpected-id"),
+                "not json",
+                "[1, 2]",
+                _batch_line("plan-9"),
+                _batch_line("plan-1", content='{"type":"clarify","question":"Quale colonna?","choices":["a","b"]}'),
+            ]
+        ),
+    }
+    planner = _planner([])
+    planner._client = _sync_client(_batch_handler(state))
+
+    results = planner.fetch_batch("batch-1")
+
+    assert [result["type"] for result in results] == ["clarify", "clarify", "plan", "clarify"]
+    assert results[1]["question"] == "Quale colonna?"
+    assert results[2]["plan"]["operations"] == [{"type": "sort_rows", "by": ["amount"]}]
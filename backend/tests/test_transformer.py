@@ -1,6 +1,7 @@
 import pandas as pd
 import pytest
 
+from app.services import transformer
 from app.services.transformer import TransformationError, apply_plan
 
 
@@ -23,8 +24,8 @@ def test_apply_plan_happy_path() -> None:
 
     result = apply_plan(source, plan)
     assert list(result.columns) == ["name", "amount", "tax", "gross"]
-    assert result.iloc[0]["gross"] == 33
-    assert result.iloc[1]["name"] == "Mario"
+    pd.testing.assert_series_equal(result["gross"], pd.Series([33, 22, 11], name="gross"))
+    pd.testing.assert_series_equal(result["name"], pd.Series([None, "Mario", "Anna"], name="name"))
 
 
 def test_apply_plan_rejects_unsupported_operation() -> None:
@@ -32,3 +33,96 @@ def test_apply_plan_rejects_unsupported_operation() -> None:
     bad_plan = {"operations": [{"type": "execute_python", "code": "print(1)"}]}
     with pytest.raises(TransformationError):
         apply_plan(source, bad_plan)
+
+
+def test_apply_plan_leaves_source_frame_untouched() -> None:
+    source = pd.DataFrame({"amount": ["1", "2", None], "name": [" a ", "b", "c"]})
+    snapshot = source.copy()
+    plan = {
+        "operations": [
+            {"type": "fill_null", "column": "amount", "value": "0"},
+            {"type": "cast_type", "column": "amount", "dtype": "float64"},
+            {"type": "trim_whitespace", "columns": ["name"]},
+        ]
+    }
+
+    result = apply_plan(source, plan)
+
+    pd.testing.assert_frame_equal(source, snapshot)
+    assert result["amount"].dtype == "float64"
+    assert result["amount"].tolist() == [1.0, 2.0, 0.0]
+
+
+def test_apply_plan_checks_columns_against_earlier_renames() -> None:
+    source = pd.DataFrame({"amount": [1, 2]})
+    plan = {
+        "operations": [
+            {"type": "rename_column", "from": "amount", "to": "total"},
+            {"type": "sort_rows", "by": ["amount"]},
+        ]
+    }
+    with pytest.raises(TransformationError, match="Missing columns: amount"):
+        apply_plan(source, plan)
+
+    plan["operations"][1]["by"] = ["total"]
+    assert apply_plan(source, plan)["total"].tolist() == [1, 2]
+
+
+def test_apply_plan_sort_rows_limit_keeps_top_rows() -> None:
+    source = pd.DataFrame({"name": list("abcdef"), "amount": [5.0, None, 9.0, 1.0, 7.0, 3.0]})
+    plan = {"operations": [{"type": "sort_rows", "by": ["amount"], "ascending": False, "limit": 3}]}
+
+    result = apply_plan(source, plan)
+
+    assert result["name"].tolist() == ["c", "e", "a"]
+    assert result.index.tolist() == [0, 1, 2]
+
+
+def test_apply_plan_sort_rows_limit_keeps_row_order_for_ties() -> None:
+    source = pd.DataFrame({"row": range(8), "amount": [1, 1, 1, 1, 0, 1, 1, 1]})
+    plan = {"operations": [{"type": "sort_rows", "by": ["amount"], "limit": 3}]}
+
+    assert apply_plan(source, plan)["row"].tolist() == [4, 0, 1]
+
+    plan["operations"][0]["ascending"] = False
+    assert apply_plan(source, plan)["row"].tolist() == [0, 1, 2]
+    assert apply_plan(source.astype({"amount": "float64"}), plan)["row"].tolist() == [0, 1, 2]
+
+
+def test_apply_plan_change_case_follows_python_rules_for_non_ascii() -> None:
+    source = pd.DataFrame({"text": ["ǆx", "ß straße", None], "raw": ["ǆx", "ß straße", "abc"]})
+    plan = {
+        "operations": [
+            {"type": "cast_type", "column": "text", "dtype": "string"},
+            {"type": "change_case", "columns": ["text", "raw"], "case": "title"},
+        ]
+    }
+
+    titled = apply_plan(source, plan)
+    assert titled["text"].tolist()[:2] == ["ǅx", "Ss Straße"]
+    assert titled["raw"].tolist() == ["ǅx", "Ss Straße", "Abc"]
+
+    plan["operations"][1]["case"] = "upper"
+    upper = apply_plan(source, plan)
+    assert upper["text"].tolist()[:2] == ["ǄX", "SS STRASSE"]
+    assert upper["raw"].tolist() == ["ǄX", "SS STRASSE", "ABC"]
+
+
+def test_apply_plan_reuses_compiled_plan(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    validate_plan = transformer._validate_plan
+
+    def counting_validate_plan(plan, columns):
+        calls.append(plan)
+        return validate_plan(plan, columns)
+
+    monkeypatch.setattr(transformer, "_validate_plan", counting_validate_plan)
+    source = pd.DataFrame({"cached_amount": [3, 1, 2]})
+    plan = {"operations": [{"type": "sort_rows", "by": ["cached_amount"]}]}
+
+    first = apply_plan(source, plan)
+    second = apply_plan(source, plan)
+
+    assert first.equals(second)
+    assert first["cached_amount"].tolist() == [1, 2, 3]
+    assert len(calls) == 1
@@ -18,3 +18,12 @@ def test_usage_limiter_respects_max_uses(tmp_path: Path) -> None:
     assert usage_3 == 2
     assert remaining_3 == 0
     assert limiter.can_consume(user_id) is False
+
+
+def test_usage_limiter_bulk_lookup(tmp_path: Path) -> None:
+    limiter = UsageLimiter(db_path=tmp_path / "usage.db", max_uses=5)
+    limiter.consume("Anna")
+    limiter.consume("anna")
+    limiter.consume("mario")
+
+    assert limiter.get_usage_bulk(["ANNA", "mario", "nuovo"]) == {"ANNA": 2, "mario": 1, "nuovo": 0}